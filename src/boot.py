@@ -0,0 +1,13 @@
+# Trace capture is opt-in: when /trace_on exists, code.py gets write access to
+# the drive so c7k_trace can save /trace.c7kr (the host then sees it read-only).
+# Send "trace off" on the serial console, or delete the flag from the REPL,
+# and reset to hand the drive back to the host.
+
+import os
+import storage
+
+try:
+    os.stat("/trace_on")
+    storage.remount("/", readonly=False)
+except OSError:
+    pass
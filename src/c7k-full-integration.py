@@ -1,260 +1,185 @@
 import board
 import busio
 import time
-import digitalio
-import displayio
 import microcontroller
-
-from i2cdisplaybus import I2CDisplayBus
-import adafruit_displayio_ssd1306
-from adafruit_display_text import label
-import terminalio
+import supervisor
 
 import adafruit_ble
 from adafruit_ble.advertising.standard import ProvideServicesAdvertisement
 from adafruit_ble.services.standard.hid import HIDService
-from adafruit_hid.keyboard import Keyboard
-from adafruit_hid.keycode import Keycode
-from adafruit_hid.mouse import Mouse
 
-from adafruit_mcp230xx.mcp23008 import MCP23008
+import c7k_display
+import c7k_serial
+import c7k_trace
+from c7k_bus import DisplayGuard
+from c7k_config import ConfigWatcher, snapshot
+from c7k_complete import load_completer
+from c7k_engine import ChordEngine
+from c7k_hosts import HostSlots
+from c7k_hud import TypingHUD
+from c7k_scanner import Scanner
+from c7k_stats import ChordStats
+from c7k_steno import load_steno
+from c7k_timing import AdaptiveTiming
+from c7k_transport import Transport
 
 # —— OLED Power & Reset ——
-vcc = digitalio.DigitalInOut(board.VCC_OFF)       # drives P0_20
-vcc.direction = digitalio.Direction.OUTPUT
-vcc.value = True
-time.sleep(0.2)  # let rail settle
-
-displayio.release_displays()
-for p in (microcontroller.pin.P0_20, microcontroller.pin.P0_17):
-    try:
-        digitalio.DigitalInOut(p).deinit()
-    except Exception:
-        pass
+vcc = c7k_display.power_on()
 
 # —— I²C Bus @400 kHz ——
 i2c = busio.I2C(scl=board.SCL, sda=board.SDA, frequency=400000)
 
-# —— SSD1306 OLED Init ——
-bus = I2CDisplayBus(i2c, device_address=0x3C)
-display = adafruit_displayio_ssd1306.SSD1306(bus, width=128, height=64)
-splash = displayio.Group()
-display.root_group = splash
-txt = label.Label(terminalio.FONT, text="", x=0, y=32, scale=4)
-splash.append(txt)
-
-# Rolling text buffer
-text_buffer = ""
-
-def update_display(msg: str):
-    global text_buffer
-    text_buffer += msg
-    if len(text_buffer) > 5:
-        text_buffer = text_buffer[-5:]
-    txt.text = text_buffer
+# —— SSD1306 OLED Init (displayio, or the page-addressed "framebuffer" backend;
+#    dropped on I2C errors and re-initialised later, scanning carries on) ——
+DISPLAY_BACKEND = "displayio"
 
-# —— Keycode → ASCII Map ——
-KEYCODE_CHAR = {}
-for i in range(26):
-    c = chr(ord('A') + i)
-    KEYCODE_CHAR[getattr(Keycode, c)] = c
-nums = ['ZERO','ONE','TWO','THREE','FOUR','FIVE','SIX','SEVEN','EIGHT','NINE']
-for digit, name in zip('0123456789', nums):
-    KEYCODE_CHAR[getattr(Keycode, name)] = digit
-KEYCODE_CHAR[Keycode.SPACE] = ' '
-KEYCODE_CHAR[Keycode.ENTER] = '\n'
+def make_display():
+    if DISPLAY_BACKEND == "framebuffer":
+        from c7k_oled import FrameBufferDisplay
+        return FrameBufferDisplay(i2c)
+    return c7k_display.Display(i2c)
 
-def key_to_char(kc):
-    return KEYCODE_CHAR.get(kc, '?')
-
-# —— Shift + Number → Symbol Map ——
-SHIFT_NUM_SYMBOLS = {
-    Keycode.ONE:   '!',
-    Keycode.TWO:   '@',
-    Keycode.THREE: '#',
-    Keycode.FOUR:  '$',
-    Keycode.FIVE:  '%',
-    Keycode.SIX:   '^',
-    Keycode.SEVEN: '&',
-    Keycode.EIGHT: '*',
-    Keycode.NINE:  '(',
-    Keycode.ZERO:  ')'
-}
-
-# —— Mouse Button Chords ——
-mouse_button_chords = {
-    (0, 1): Mouse.LEFT_BUTTON,     # Pinky + Ring → left-click
-    (2, 3): Mouse.RIGHT_BUTTON,    # Middle + Index → right-click
-    (1, 2): Mouse.MIDDLE_BUTTON,   # Ring + Middle → middle-click
-    (0, 4): Mouse.BACK_BUTTON,     # Pinky + Thumb → “back” button
-    (3, 4): Mouse.FORWARD_BUTTON   # Index + Thumb → “forward” button
-}
+display = DisplayGuard(make_display, now=time.monotonic())
 
 # —— MCP23008 Expander Setup ——
-mcp = MCP23008(i2c)
-for i in range(7):
-    p = mcp.get_pin(i)
-    p.direction = digitalio.Direction.INPUT
-    p.pull = digitalio.Pull.UP
+scanner = Scanner(i2c)
 
-# —— BLE HID Setup ——
+# —— HID Transports (USB when enumerated, BLE otherwise) ——
 ble = adafruit_ble.BLERadio()
 hid = HIDService()
 advertisement = ProvideServicesAdvertisement(hid)
-keyboard = Keyboard(hid.devices)
-mouse    = Mouse(hid.devices)
-
-# —— Chording Configuration ——
-pin_to_key_index  = {i: i for i in range(7)}
-pressed_keys      = [False] * 7
-pending_combo     = None
-last_hold_time    = 0
-last_release_time = 0
-last_combo_time   = 0
-
-MIN_HOLD     = 0.01
-COMBO_WINDOW = 0.01
-COOLDOWN     = 0.01
-RELEASE_WIN  = 0.01
-
-modifier_armed   = False
-held_modifier    = None
-mod_trigger      = (5, 6)
-modifier_chords  = {
-    (0,): Keycode.LEFT_SHIFT,
-    (1,): Keycode.LEFT_CONTROL,
-    (2,): Keycode.LEFT_ALT,
-    (3,): Keycode.LEFT_GUI
-}
-
-mouse_armed    = False
-mouse_trigger  = (4, 5)
-
-chords = {
-    (0,): Keycode.E,   (1,): Keycode.I,    (2,): Keycode.A,
-    (3,): Keycode.S,   (4,): Keycode.SPACE,(0,1): Keycode.R,
-    (0,2): Keycode.O,  (0,3): Keycode.C,    (1,2): Keycode.N,
-    (1,3): Keycode.L,  (2,3): Keycode.T,    (0,5): Keycode.M,
-    (1,5): Keycode.G,  (2,5): Keycode.H,    (3,5): Keycode.B,
-    (0,6): Keycode.SPACE,
-    (0,1,5): Keycode.Y,(0,2,5): Keycode.W,  (0,3,5): Keycode.X,
-    (1,2,5): Keycode.F,(1,3,5): Keycode.K,  (2,3,5): Keycode.V,
-    (0,1,2): Keycode.D,(1,2,3): Keycode.P,
-    (0,1,2,5): Keycode.J,(1,2,3,5): Keycode.Z,
-    (0,1,2,3): Keycode.U,(0,1,2,3,5): Keycode.Q,
-    (0,1,3,5): Keycode.DELETE,
-    (0,4): Keycode.ONE,(1,4): Keycode.TWO,  (2,4): Keycode.THREE,
-    (3,4): Keycode.FOUR,(0,1,4): Keycode.FIVE,(1,2,4): Keycode.SIX,
-    (2,3,4): Keycode.SEVEN,(0,2,4): Keycode.EIGHT,(1,3,4): Keycode.NINE,
-    (0,1,3): Keycode.BACKSPACE,
-    (0,2,3): Keycode.SPACE,
-    (0,3,4): Keycode.UP_ARROW,
-    (0,1,2,4): Keycode.ZERO,
-    (0,1,3,4): Keycode.RIGHT_ARROW,
-    (0,2,3,4): Keycode.LEFT_ARROW,
-    (1,2,3,4): Keycode.ESCAPE,
-    (0,1,2,3,4): Keycode.DOWN_ARROW,
-    (6,): Keycode.BACKSPACE,
-    (1,6): Keycode.TAB,   (2,6): Keycode.PERIOD, (3,6): Keycode.MINUS,
-    (2,3,6): Keycode.FORWARD_SLASH,
-    (0,1,6): Keycode.ENTER,(0,2,6): Keycode.COMMA,
-    (1,3,6): Keycode.LEFT_BRACKET,(0,3,6): Keycode.RIGHT_BRACKET,
-    (1,2,3,6): Keycode.BACKSLASH,(1,2,6): Keycode.BACKSPACE,
-    (0,1,3,6): Keycode.QUOTE,(0,2,3,6): Keycode.SEMICOLON,
-    (0,1,2,3,6): Keycode.GRAVE_ACCENT
-}
-
-# —— BLE Advertise & Connect ——
-update_display("")
-update_display("ADV")
-ble.start_advertising(advertisement)
-while not ble.connected:
+transport = Transport(ble, hid, advertisement)
+keyboard  = transport.keyboard
+mouse     = transport.mouse
+
+# —— Chord Usage Statistics (flushed to nvm, exported with "stats" on serial) ——
+NVM_STATS = 0
+stats = ChordStats(microcontroller.nvm, NVM_STATS)
+
+def handle_command(cmd):
+    if cmd == "stats":
+        c7k_serial.write_binary("C7KS", stats.pack())
+    elif cmd == "stats reset":
+        stats.reset()
+    elif cmd == "display":
+        print(display.summary())
+    elif cmd == "hosts":
+        print(hosts.summary())
+    elif cmd == "hud":
+        print(hud.summary())
+    elif cmd == "split":
+        print(split.summary() if split else "split off (SPLIT = False)")
+    elif cmd == "steno":
+        print(engine.steno.summary() if engine.steno else "steno off (no /steno.c7kd)")
+    elif cmd.startswith("config"):
+        print(config.command(cmd))
+    elif cmd.startswith("timing"):
+        print(timing.command(cmd))
+    elif cmd == "trace":
+        print(trace.summary() if trace else "trace off (create /trace_on and reset to enable)")
+    elif cmd == "trace off":
+        if trace:
+            trace.flush(time.monotonic(), force=True)
+            trace.close()
+        print("trace disabled" if c7k_trace.disable() else "trace flag not removable")
+    elif cmd == "bus":
+        print(scanner.summary())
+        print(display.summary())
+
+# —— Chord Engine (tables in c7k_keymap) ——
+engine = ChordEngine(scanner, keyboard, mouse, display, stats, load_completer("/words.c7kt"))
+
+# —— Steno Dictionary (multi-stroke output, toggled with steno_chord) ——
+engine.steno = load_steno("/steno.c7kd", engine)
+
+# —— BLE Host Slots (identity per slot in nvm, switched with host chords) ——
+NVM_HOSTS = 7680
+hosts = HostSlots(ble, transport, microcontroller.nvm, NVM_HOSTS)
+
+def switch_host(slot):
+    if hosts.select(slot):
+        display.show_word("H%d" % (slot + 1))
+
+engine.on_host = switch_host
+
+# —— Wireless Split (opt-in: connects as central to a half running
+#    c7k-split-half.py, whose keys scan as keys 7..13; scans for it only
+#    while idle) ——
+SPLIT = False
+
+split = None
+if SPLIT:
+    from c7k_split import SplitLink
+    split = SplitLink(ble, transport)
+    scanner.remote = split
+
+# —— Typing HUD (WPM, p95 press-to-report latency, layers and link; toggled
+#    with hud_chord, redrawn once a second while shown) ——
+hud = TypingHUD(display, engine, transport, hosts, now=time.monotonic())
+engine.on_hud = hud.toggle
+
+# —— Live Config (serial "config {...}" or /c7k_config.json, applied between
+#    scans; autoreload is off so saving files never drops the BLE link) ——
+supervisor.runtime.autoreload = False
+config = ConfigWatcher(engine)
+
+# —— Adaptive Chord Timing (learned from finger skew, kept in nvm; a config
+#    that sets timing explicitly freezes it, "timing thaw" resumes) ——
+NVM_TIMING = 7936
+timing = AdaptiveTiming(engine, microcontroller.nvm, NVM_TIMING)
+config.on_timing = timing.freeze
+
+# —— Trace Recorder (opt-in: boot.py leaves the drive writable when /trace_on exists) ——
+trace = c7k_trace.open_trace("/trace.c7kr")
+engine.trace = trace
+transport.trace = trace
+last_mask = 0
+traced = None       # settings last written to the trace
+
+def trace_settings():
+    global traced
+    key = (engine.keymap, engine.min_hold, engine.combo_window, engine.cooldown, engine.release_win)
+    if key != traced:
+        traced = key
+        trace.settings(snapshot(engine))
+
+# —— Advertise & Connect (BLE or USB) ——
+display.show_word("ADV")
+transport.select()
+while not transport.connected:
     time.sleep(0.05)
-ble.stop_advertising()
-update_display("CONN")
-
-# —— Chord Processing Function ——
-def check_chords():
-    global pending_combo, last_hold_time, last_release_time, last_combo_time
-    global modifier_armed, held_modifier, mouse_armed
-
-    now = time.monotonic()
-    combo = tuple(i for i, d in enumerate(pressed_keys) if d)
-
-    if combo:
-        if last_hold_time == 0:
-            last_hold_time = now
-        if now - last_hold_time >= MIN_HOLD:
-            # Modifier layer arm
-            if combo == mod_trigger:
-                modifier_armed = True; mouse_armed = False; held_modifier = None
-                pending_combo = combo; last_combo_time = now
-                return
-            # Mouse layer toggle
-            if combo == mouse_trigger:
-                mouse_armed = not mouse_armed; modifier_armed = False; held_modifier = None
-                pending_combo = combo; last_combo_time = now
-                return
-            # Mouse movement
-            if mouse_armed and combo != pending_combo:
-                dx = dy = 0
-                if combo == (0,): dy = -10
-                elif combo == (1,): dx =  10
-                elif combo == (2,): dx = -10
-                elif combo == (3,): dy =  10
-                if dx or dy:
-                    mouse.move(dx, dy)
-                    pending_combo = combo; last_combo_time = now
-                    update_display('?')
-                    time.sleep(COOLDOWN)
-                    return
-            # Mouse button clicks
-            if mouse_armed and combo in mouse_button_chords:
-                mouse.click(mouse_button_chords[combo])
-                pending_combo = combo; last_combo_time = now
-                update_display('?')
-                time.sleep(COOLDOWN)
-                return
-            # Pick modifier
-            if modifier_armed and held_modifier is None and combo in modifier_chords:
-                held_modifier = modifier_chords[combo]
-                pending_combo = combo; last_combo_time = now
-                mod_char = {
-                    Keycode.LEFT_SHIFT: 'S',
-                    Keycode.LEFT_CONTROL: 'C',
-                    Keycode.LEFT_ALT: 'A',
-                    Keycode.LEFT_GUI: 'G'
-                }.get(held_modifier, '?')
-                update_display(mod_char)
-                return
-            # Modifier + key
-            if modifier_armed and held_modifier and combo in chords:
-                key = chords[combo]
-                keyboard.press(held_modifier, key)
-                keyboard.release_all()
-                if held_modifier == Keycode.LEFT_SHIFT and key in SHIFT_NUM_SYMBOLS:
-                    ch = SHIFT_NUM_SYMBOLS[key]
-                else:
-                    ch = key_to_char(key)
-                modifier_armed = False; held_modifier = None
-                pending_combo = combo; last_combo_time = now
-                update_display(ch); time.sleep(COOLDOWN); return
-            # Normal chord
-            if not modifier_armed and not mouse_armed and combo in chords:
-                if pending_combo is None or (now - last_combo_time) <= COMBO_WINDOW:
-                    if combo != pending_combo:
-                        key = chords[combo]
-                        keyboard.press(key); keyboard.release_all()
-                        ch = key_to_char(key)
-                        pending_combo = combo; last_combo_time = now
-                        update_display(ch); time.sleep(COOLDOWN)
-    else:
-        if last_release_time == 0 or (now - last_release_time) >= RELEASE_WIN:
-            pending_combo = None; last_hold_time = 0; last_release_time = now
+    transport.select()
+display.show_word(transport.active.name)
 
 # —— Main Loop ——
-while ble.connected:
-    for pin, idx in pin_to_key_index.items():
-        pressed_keys[idx] = not mcp.get_pin(pin).value
-    check_chords()
+while transport.connected or hosts.switching:
+    if transport.select():
+        display.show_word(transport.active.name)
+        print(transport.summary())
+    if hosts.poll(time.monotonic()):
+        display.show_hint("host %d: %d ms" % (hosts.active + 1, hosts.switch_ms))
+        print(hosts.summary())
+    if split and split.poll(time.monotonic(), not last_mask):
+        print(split.summary())
+    mask = scanner.scan()
+    if trace and mask != last_mask:
+        trace.mask(mask)
+    last_mask = mask
+    hud.observe(mask)
+    engine.check_chords()
+    timing.observe(mask, time.monotonic())
+    hud.tick(time.monotonic())
+    display.tick(time.monotonic())
+    if not mask:
+        stats.maybe_flush(time.monotonic())
+        timing.maybe_save(time.monotonic())
+        if trace:
+            trace_settings()
+            trace.flush(time.monotonic())
+        msg = config.poll(time.monotonic())
+        if msg:
+            print(msg)
+        cmd = c7k_serial.poll()
+        if cmd:
+            handle_command(cmd)
     time.sleep(0.05)
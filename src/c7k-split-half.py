@@ -0,0 +1,40 @@
+import board
+import busio
+import time
+
+import adafruit_ble
+from adafruit_ble.advertising.standard import ProvideServicesAdvertisement
+
+import c7k_display
+from c7k_scanner import Scanner
+from c7k_split import ADV_INTERVAL, SplitService, SplitSender
+
+# Secondary half of a wireless split: no host link and no chord engine, only
+# the key scan streamed to the main half (c7k-full-integration.py), which
+# connects to this board as a BLE central.
+
+# —— External VCC rail (the expander shares it with the OLED) ——
+vcc = c7k_display.power_on()
+
+# —— I²C Bus @400 kHz ——
+i2c = busio.I2C(scl=board.SCL, sda=board.SDA, frequency=400000)
+
+# —— MCP23008 Expander Setup ——
+scanner = Scanner(i2c)
+
+# —— Split Service (advertised until the main half connects) ——
+ble = adafruit_ble.BLERadio()
+service = SplitService()
+advertisement = ProvideServicesAdvertisement(service)
+sender = SplitSender(service.tx, service.rx)
+
+# —— Main Loop ——
+while True:
+    if not ble.connected:
+        if not ble.advertising:
+            ble.start_advertising(advertisement, interval=ADV_INTERVAL)
+        sender.mask = -1                # resend the full mask on reconnect
+        time.sleep(0.1)
+        continue
+    sender.update(scanner.scan(), time.monotonic())
+    time.sleep(0.01)
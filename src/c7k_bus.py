@@ -0,0 +1,133 @@
+# I2C fault handling: non-blocking retry backoff and a display guard that drops
+# the OLED on bus errors and re-creates it later, so a loose cable or a glitch
+# on the VCC_OFF rail never stops key scanning or the BLE link.
+
+import time
+
+BACKOFF_FIRST = 0.05
+BACKOFF_LIMIT = 2.0
+
+
+class Backoff:
+    """Tracks a failing device: when to retry next, errors and recoveries."""
+
+    def __init__(self, first=BACKOFF_FIRST, limit=BACKOFF_LIMIT):
+        self.first = first
+        self.limit = limit
+        self.delay = first
+        self.retry_at = 0
+        self.failing = False
+        self.errors = 0
+        self.recoveries = 0
+
+    def fail(self, now):
+        self.errors += 1
+        self.failing = True
+        self.retry_at = now + self.delay
+        self.delay = min(self.delay * 2, self.limit)
+
+    def ready(self, now):
+        return now >= self.retry_at
+
+    def ok(self):
+        if self.failing:
+            self.recoveries += 1
+            self.failing = False
+        self.delay = self.first
+
+    def summary(self):
+        return "errors=%d recoveries=%d%s" % (self.errors, self.recoveries, " FAILING" if self.failing else "")
+
+
+class DisplayGuard:
+    """Forwards update()/show_word()/show_hint()/tick() to a display made by factory().
+
+    An OSError (from drawing, or from the backend's own health check in
+    tick()) drops the display; tick() re-creates it (which re-sends the
+    SSD1306 init sequence) on the backoff schedule and restores the text.
+    While a status screen is shown (show_status), text and hints are still
+    tracked but only drawn once it is dismissed.
+    """
+
+    def __init__(self, factory, cells=5, now=0):
+        self.factory = factory
+        self.cells = cells
+        self.backoff = Backoff()
+        self.display = None
+        self.text_buffer = ""
+        self.hint_text = ""
+        self.status = None      # (big row, hint row) of a status screen
+        self.connect(now)
+
+    def connect(self, now):
+        try:
+            self.display = self.factory()
+            if self.status is not None:
+                self.display.redraw(*self.status)
+            elif self.text_buffer or self.hint_text:
+                self.display.redraw(self.text_buffer, self.hint_text)
+        except (OSError, RuntimeError, ValueError):
+            self.display = None
+            self.backoff.fail(now)
+            return False
+        self.backoff.ok()
+        return True
+
+    def drop(self, now):
+        self.display = None
+        self.backoff.fail(now)
+
+    def update(self, msg):
+        self.text_buffer = (self.text_buffer + msg)[-self.cells:]
+        if self.display is not None:
+            try:
+                if self.status is None:
+                    self.display.update(msg)
+                else:
+                    self.display.wake()
+            except OSError:
+                self.drop(time.monotonic())
+
+    def show_word(self, word):
+        """Replace the text row with a status word (ADV, BLE, H2) in one redraw,
+        so it is never split across the typewriter row's wrap point."""
+        self.text_buffer = word[-self.cells:]
+        if self.display is not None and self.status is None:
+            try:
+                self.display.redraw(self.text_buffer, self.hint_text)
+            except OSError:
+                self.drop(time.monotonic())
+
+    def show_hint(self, text):
+        self.hint_text = text
+        if self.display is not None and self.status is None:
+            try:
+                self.display.show_hint(text)
+            except OSError:
+                self.drop(time.monotonic())
+
+    def show_status(self, status, wake=True):
+        """Cover the screen with status = (big, hint); None restores the text."""
+        self.status = status
+        if self.display is not None:
+            try:
+                if status is None:
+                    self.display.redraw(self.text_buffer, self.hint_text, wake)
+                else:
+                    self.display.redraw(status[0], status[1], wake)
+            except OSError:
+                self.drop(time.monotonic())
+
+    def tick(self, now):
+        if self.display is None:
+            if self.backoff.ready(now):
+                self.connect(now)
+            return
+        try:
+            self.display.tick(now)
+        except OSError:
+            self.drop(now)
+
+    def summary(self):
+        inner = self.display.summary() if self.display is not None else "display offline"
+        return "%s, %s" % (inner, self.backoff.summary())
@@ -0,0 +1,67 @@
+# Word completion over a flat, compressed (radix) trie built by tools/build_trie.py.
+#
+# Layout (little endian):
+#   header : b"C7KT" | u8 version | u24 root offset
+#   node   : u8 n_edges | u24 best word offset (0xFFFFFF = none) | n_edges * edge
+#   edge   : u8 first byte | u8 label length | u24 label offset | u24 child offset
+#   word   : u8 length | bytes
+# Edges are sorted by first byte. Lookups walk the file through a memoryview
+# (c7k_flat: in RAM for small dictionaries, node by node from flash for larger).
+
+from c7k_flat import NONE, FlatFile, load_flat, u24
+
+MAGIC = b"C7KT"
+VERSION = 1
+EDGE_SIZE = 8
+
+
+class Completer(FlatFile):
+    MAGIC = MAGIC
+    VERSION = VERSION
+    SCRATCH = 4 + 256 * EDGE_SIZE
+    KIND = "c7k trie"
+
+    def best(self, prefix):
+        """Return the offset of the top word starting with prefix, or NONE."""
+        node = self.root
+        i = 0
+        n = len(prefix)
+        while i < n:
+            c = prefix[i]
+            mv = self._read(node, 1)
+            cnt = mv[0]
+            mv = self._read(node, 4 + cnt * EDGE_SIZE)
+            e = 4
+            end = e + cnt * EDGE_SIZE
+            while e < end and mv[e] < c:
+                e += EDGE_SIZE
+            if e == end or mv[e] != c:
+                return NONE
+            ln = mv[e + 1]
+            lo = u24(mv, e + 2)
+            node = u24(mv, e + 5)
+            if ln > 1 and i + 1 < n:
+                mv = self._read(lo, ln)
+                j = 1
+                while j < ln and i + j < n:
+                    if mv[j] != prefix[i + j]:
+                        return NONE
+                    j += 1
+            i += ln
+        mv = self._read(node, 4)
+        return u24(mv, 1)
+
+    def complete(self, prefix):
+        """Return the remaining characters of the top word for prefix, or ""."""
+        off = self.best(prefix)
+        if off == NONE:
+            return ""
+        ln = self._read(off, 1)[0]
+        if ln <= len(prefix):
+            return ""
+        mv = self._read(off + 1, ln)
+        return str(bytes(mv[len(prefix):ln]), "ascii")
+
+
+def load_completer(path):
+    return load_flat(path, Completer)
@@ -0,0 +1,207 @@
+# Runtime configuration: chord tables and timing changed without a soft reload.
+#
+# A config is JSON, sent as a "config {...}" serial line or saved to
+# CONFIG_PATH (polled by mtime while no keys are held):
+#
+#   {"timing":   {"min_hold": 0.02, "combo_window": 0.03, "cooldown": 0.01, "release_win": 0.01},
+#    "repeat":   {"delay": 0.4, "interval": 0.05},
+#    "chords":   {"0": "E", "0,1": "R", "1,2,6": "BACKSPACE"},
+#    "remove":   ["0,6"],
+#    "replace":  false,
+#    "hold_tap": {"6": "LEFT_SHIFT", "4": null},
+#    "triggers": {"mod_trigger": "5,6", "mouse_trigger": "4,5", "complete_chord": "4,6"}}
+#
+# Chords are comma-separated key indices (0..6 this board, 7..13 the secondary
+# split half), values Keycode names. Everything is
+# validated and compiled into a new Keymap first; the engine then switches
+# with one attribute assignment, so a bad config changes nothing.
+
+import json
+import os
+
+import c7k_engine
+import c7k_keymap
+
+CONFIG_PATH = "/c7k_config.json"
+CHECK_INTERVAL = 1.0
+TIMING = ("min_hold", "combo_window", "cooldown", "release_win")
+TRIGGERS = ("mod_trigger", "mouse_trigger", "complete_chord")
+
+
+class Keymap:
+    """A chord table with the same attributes the engine reads from c7k_keymap."""
+
+    def __init__(self, base=c7k_keymap):
+        for name in dir(base):
+            if not name.startswith("_"):
+                setattr(self, name, getattr(base, name))
+        self.chords = dict(base.chords)
+        self.repeat_chords = dict(base.repeat_chords)
+
+
+def parse_combo(text):
+    combo = tuple(sorted(set(int(k) for k in str(text).split(","))))
+    if not combo or combo[0] < 0 or combo[-1] >= c7k_keymap.KEYS:
+        raise ValueError("bad chord %r" % text)
+    return combo
+
+
+def keycode(name):
+    kc = getattr(c7k_keymap.Keycode, str(name).upper(), None)
+    if not isinstance(kc, int):
+        raise ValueError("unknown keycode %r" % name)
+    return kc
+
+
+def reserved_chords(km):
+    """Chords the engine acts on before the chord table; a config may not map them."""
+    return [getattr(km, n) for n in TRIGGERS] + list(km.host_chords) + [km.hud_chord, km.steno_chord]
+
+
+def check_trigger(km, name):
+    """Reject a trigger moved inside a host, HUD or steno chord. The built-in
+    ones already contain the built-in triggers and only fire when pressed
+    together (ChordEngine.pressed_together); a config adds no new overlaps."""
+    trigger = set(getattr(km, name))
+    for combo in list(km.host_chords) + [km.hud_chord, km.steno_chord]:
+        if trigger <= set(combo):
+            raise ValueError("%s %r is inside reserved chord %r" % (name, getattr(km, name), combo))
+
+
+def snapshot(engine):
+    """The engine's live chord table, triggers, hold-tap, repeat and timing as
+    a config; compile_config() turns it back into the same state."""
+    km = engine.keymap
+    names = {}
+    for name in dir(km.Keycode):
+        value = getattr(km.Keycode, name)
+        if isinstance(value, int) and not name.startswith("_"):
+            names.setdefault(value, name)
+    return {
+        "replace": True,
+        "chords": {",".join(str(k) for k in c): names[kc] for c, kc in km.chords.items()},
+        "triggers": {n: ",".join(str(k) for k in getattr(km, n)) for n in TRIGGERS},
+        "hold_tap": {str(k): names[km.hold_tap[k]] if k in km.hold_tap else None for k in range(km.KEYS)},
+        "repeat": {"delay": km.REPEAT_DELAY, "interval": km.REPEAT_INTERVAL},
+        "timing": {n: getattr(engine, n) for n in TIMING},
+    }
+
+
+def compile_config(cfg, current):
+    """Return (Keymap, timing dict) for cfg layered over the current keymap."""
+    km = Keymap(c7k_keymap if cfg.get("replace") else current)
+    if cfg.get("replace"):
+        km.chords = {}
+    for combo in cfg.get("remove", ()):
+        km.chords.pop(parse_combo(combo), None)
+    for combo, name in cfg.get("chords", {}).items():
+        km.chords[parse_combo(combo)] = keycode(name)
+    for name, combo in cfg.get("triggers", {}).items():
+        if name not in TRIGGERS:
+            raise ValueError("unknown trigger %r" % name)
+        combo = parse_combo(combo)
+        if combo != getattr(km, name):
+            setattr(km, name, combo)
+            check_trigger(km, name)
+    hold_tap = cfg.get("hold_tap")
+    if hold_tap:
+        km.hold_tap = dict(km.hold_tap)
+        for k, name in hold_tap.items():
+            k = parse_combo(k)
+            if len(k) != 1:
+                raise ValueError("hold-tap takes one key, got %r" % (k,))
+            if name is None:
+                km.hold_tap.pop(k[0], None)
+            else:
+                km.hold_tap[k[0]] = keycode(name)
+    repeat = cfg.get("repeat")
+    if repeat:
+        delay = float(repeat.get("delay", km.REPEAT_DELAY))
+        interval = float(repeat.get("interval", km.REPEAT_INTERVAL))
+        if not 0 < interval <= delay:
+            raise ValueError("repeat interval must be > 0 and <= delay")
+        km.REPEAT_DELAY, km.REPEAT_INTERVAL = delay, interval
+        km.repeat_chords = {c: (delay, interval) for c in km.repeat_chords}
+    km.repeat_chords = {c: t for c, t in km.repeat_chords.items() if c in km.chords}
+    for combo in reserved_chords(km):
+        if combo in km.chords:
+            raise ValueError("chord %r is reserved" % (combo,))
+    timing = {}
+    for name, value in cfg.get("timing", {}).items():
+        if name not in TIMING:
+            raise ValueError("unknown timing %r" % name)
+        value = float(value)
+        if not 0 <= value <= 1.0:
+            raise ValueError("%s out of range" % name)
+        timing[name] = value
+    return km, timing
+
+
+class ConfigWatcher:
+    def __init__(self, engine, path=CONFIG_PATH):
+        self.engine = engine
+        self.path = path
+        self.mtime = None       # so the first poll() applies an existing file
+        self.next_check = 0
+        self.applied = 0
+        self.rejected = 0
+        self.on_timing = None   # called when a config sets timing explicitly
+
+    def stat(self):
+        try:
+            return os.stat(self.path)[8]
+        except OSError:
+            return None
+
+    def apply(self, text):
+        """Compile a JSON config and swap it in; returns a status line."""
+        try:
+            km, timing = compile_config(json.loads(text), self.engine.keymap)
+        except (ValueError, TypeError, AttributeError) as e:
+            self.rejected += 1
+            return "config rejected: %s" % e
+        engine = self.engine
+        for name, value in timing.items():
+            setattr(engine, name, value)
+        if timing and self.on_timing:
+            self.on_timing()
+        engine.keymap = km
+        engine.pending_combo = None
+        self.applied += 1
+        return "config applied: %d chords, %s" % (
+            len(km.chords), " ".join("%s=%g" % (n, getattr(engine, n)) for n in TIMING))
+
+    def reload(self):
+        try:
+            with open(self.path) as f:
+                return self.apply(f.read())
+        except OSError as e:
+            self.rejected += 1
+            return "config unreadable: %s" % e
+
+    def poll(self, now):
+        """Re-apply the config file if it changed; call between scans."""
+        if now < self.next_check:
+            return None
+        self.next_check = now + CHECK_INTERVAL
+        mtime = self.stat()
+        if mtime is None or mtime == self.mtime:
+            return None
+        self.mtime = mtime
+        return self.reload()
+
+    def command(self, cmd):
+        """Handle "config ..." serial lines; returns a status line."""
+        arg = cmd[6:].strip()
+        if arg == "reload":
+            return self.reload()
+        if arg == "reset":
+            for name in TIMING:
+                setattr(self.engine, name, getattr(c7k_engine, name.upper()))
+            self.engine.keymap = c7k_keymap
+            return "config reset to built-in tables and timing"
+        if arg == "show":
+            e = self.engine
+            return "config: %d chords, %s" % (
+                len(e.keymap.chords), " ".join("%s=%g" % (n, getattr(e, n)) for n in TIMING))
+        return self.apply(arg)
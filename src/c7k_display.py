@@ -0,0 +1,230 @@
+# SSD1306 OLED: power-up, rolling 5-character tail and a one-line hint above it.
+
+import time
+import board
+import digitalio
+import displayio
+import microcontroller
+import terminalio
+
+from i2cdisplaybus import I2CDisplayBus
+import adafruit_displayio_ssd1306
+from adafruit_display_text import label
+
+CELLS = 5
+SCALE = 4
+TEXT_Y = 10                 # top of the 4x text row; the hint line sits above it
+GLYPHS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()? "
+HINT_GLYPHS = "".join(chr(c) for c in range(32, 127))
+HINT_CELLS = 21             # 128 px / 6 px terminalio cells
+HINT_Y = -2                 # cell top; the hint Label was centred on y=4
+RENDERER = "tiles"          # "label" restores the scaled Label for comparison
+TILE_MODE = "wrap"          # each key lands in the next cell (one tile per update);
+                            # "scroll" redraws the rolling tail like the Label does.
+                            # Status words go through redraw() either way.
+DIM_AFTER = 30              # idle seconds before the panel is dimmed
+OFF_AFTER = 300             # idle seconds before the panel is switched off
+DIM_LEVEL = 0.05
+PROBE_INTERVAL = 1.0        # displayio refreshes in the background and never
+                            # raises, so tick() checks the panel still ACKs
+PROBE = b"\x00\xe3"         # command stream: SSD1306 NOP
+
+
+def power_on():
+    # —— OLED Power & Reset ——
+    vcc = digitalio.DigitalInOut(board.VCC_OFF)       # drives P0_20
+    vcc.direction = digitalio.Direction.OUTPUT
+    vcc.value = True
+    time.sleep(0.2)  # let rail settle
+
+    displayio.release_displays()
+    for p in (microcontroller.pin.P0_20, microcontroller.pin.P0_17):
+        try:
+            digitalio.DigitalInOut(p).deinit()
+        except Exception:
+            pass
+    return vcc
+
+
+class TileText:
+    """A row of fixed-width cells drawn from a sprite sheet rendered once at boot.
+
+    Changing a cell is a tile-index assignment, so displayio only refreshes
+    that cell instead of the whole text area.
+    """
+
+    def __init__(self, font, glyphs=GLYPHS, cells=CELLS, scale=SCALE, x=0, y=TEXT_Y):
+        w, h = font.get_bounding_box()[:2]
+        if " " not in glyphs:
+            glyphs += " "
+        self.sheet = displayio.Bitmap(w * len(glyphs), h, 2)
+        for i, ch in enumerate(glyphs):
+            g = font.get_glyph(ord(ch))
+            if g is None or ch == " ":
+                continue
+            src = g.bitmap
+            per_row = src.width // g.width
+            sx = (g.tile_index % per_row) * g.width
+            sy = (g.tile_index // per_row) * g.height
+            for yy in range(min(g.height, h)):
+                for xx in range(min(g.width, w)):
+                    if src[sx + xx, sy + yy]:
+                        self.sheet[i * w + xx, yy] = 1
+        palette = displayio.Palette(2)
+        palette[0] = 0x000000
+        palette[1] = 0xFFFFFF
+        self.index = {ch: i for i, ch in enumerate(glyphs)}
+        self.index.setdefault("\n", self.index[" "])
+        self.unknown = self.index.get("?", self.index[" "])
+        self.grid = displayio.TileGrid(self.sheet, pixel_shader=palette, width=cells, height=1,
+                                       tile_width=w, tile_height=h, default_tile=self.index[" "])
+        self.group = displayio.Group(scale=scale, x=x, y=y)
+        self.group.append(self.grid)
+        self.shown = [" "] * cells
+        self.cell_px = w * h * scale * scale
+
+    def set(self, i, ch):
+        """Show ch in cell i; returns the pixel area marked dirty."""
+        if self.shown[i] == ch:
+            return 0
+        self.shown[i] = ch
+        self.grid[i] = self.index.get(ch, self.unknown)
+        return self.cell_px
+
+    def show(self, text):
+        dirty = 0
+        for i in range(len(self.shown)):
+            dirty += self.set(i, text[i] if i < len(text) else " ")
+        return dirty
+
+
+class Display:
+    def __init__(self, i2c, address=0x3C, renderer=RENDERER, glyphs=GLYPHS):
+        displayio.release_displays()
+        self.i2c = i2c
+        self.address = address
+        self.next_probe = 0
+        self.bus = I2CDisplayBus(i2c, device_address=address)
+        self.display = adafruit_displayio_ssd1306.SSD1306(self.bus, width=128, height=64)
+        self.splash = displayio.Group()
+        self.display.root_group = self.splash
+        self.renderer = renderer
+        if renderer == "tiles":
+            self.tiles = TileText(terminalio.FONT, glyphs)
+            self.splash.append(self.tiles.group)
+            self.cursor = 0
+        else:
+            self.txt = label.Label(terminalio.FONT, text="", x=0, y=34, scale=SCALE)
+            self.splash.append(self.txt)
+        # The hint changes with most keystrokes while completing words, so the
+        # tile renderer draws it as 1x tiles too.
+        if renderer == "tiles":
+            self.hint = TileText(terminalio.FONT, HINT_GLYPHS, cells=HINT_CELLS, scale=1, y=HINT_Y)
+            self.splash.append(self.hint.group)
+        else:
+            self.hint = label.Label(terminalio.FONT, text="", x=0, y=4)
+            self.splash.append(self.hint)
+        self.hint_text = ""
+        self.hint_updates = 0
+        self.hint_px = 0
+        # Rolling text buffer
+        self.text_buffer = ""
+        # Per-update cost: CPU time in update() and the text area marked dirty
+        self.updates = 0
+        self.update_ns = 0
+        self.dirty_px = 0
+        self.last_active = time.monotonic()
+        self.idle_state = 0     # 0 on, 1 dimmed, 2 off
+
+    def wake(self):
+        self.last_active = time.monotonic()
+        if self.idle_state:
+            if self.idle_state == 2:
+                self.display.wake()
+            self.display.brightness = 1.0
+            self.idle_state = 0
+
+    def probe(self):
+        """Send a NOP to the panel; OSError if it does not answer. Skipped
+        while displayio holds the bus for a refresh."""
+        if not self.i2c.try_lock():
+            return
+        try:
+            self.i2c.writeto(self.address, PROBE)
+        finally:
+            self.i2c.unlock()
+
+    def tick(self, now):
+        """Probe the panel, then dim and switch it off once idle long enough."""
+        if now >= self.next_probe:
+            self.next_probe = now + PROBE_INTERVAL
+            self.probe()
+        idle = now - self.last_active
+        if self.idle_state < 2 and idle >= OFF_AFTER:
+            self.display.sleep()
+            self.idle_state = 2
+        elif self.idle_state < 1 and idle >= DIM_AFTER:
+            self.display.brightness = DIM_LEVEL
+            self.idle_state = 1
+
+    def update(self, msg):
+        t0 = time.monotonic_ns()
+        self.wake()
+        old = len(self.text_buffer)
+        self.text_buffer += msg
+        if len(self.text_buffer) > CELLS:
+            self.text_buffer = self.text_buffer[-CELLS:]
+        if self.renderer != "tiles":
+            self.txt.text = self.text_buffer
+            dirty = max(old, len(self.text_buffer)) * 6 * 12 * SCALE * SCALE
+        elif TILE_MODE == "scroll":
+            dirty = self.tiles.show(self.text_buffer)
+        else:
+            # Typewriter row: each character lands in the next cell and the
+            # cell after it is blanked to mark the write position.
+            tiles = self.tiles
+            dirty = 0
+            for ch in msg:
+                dirty += tiles.set(self.cursor, ch)
+                self.cursor = (self.cursor + 1) % CELLS
+            if msg:
+                dirty += tiles.set(self.cursor, " ")
+        self.updates += 1
+        self.update_ns += time.monotonic_ns() - t0
+        self.dirty_px += dirty
+
+    def show_hint(self, text):
+        if self.hint_text != text:
+            self.wake()
+            self.draw_hint(text)
+
+    def draw_hint(self, text):
+        if self.renderer == "tiles":
+            dirty = self.hint.show(text)
+        else:
+            self.hint.text = text
+            dirty = max(len(self.hint_text), len(text)) * 6 * 12
+        self.hint_text = text
+        self.hint_updates += 1
+        self.hint_px += dirty
+
+    def redraw(self, text, hint, wake=True):
+        """Replace the whole screen (status screens, and restoring after one)."""
+        if wake:
+            self.wake()
+        text = text[-CELLS:]
+        self.text_buffer = text
+        if self.renderer != "tiles":
+            self.txt.text = text
+        else:
+            self.tiles.show(text)
+            self.cursor = len(text) % CELLS
+        if self.hint_text != hint:
+            self.draw_hint(hint)
+
+    def summary(self):
+        # The refresh moves one bit per dirty pixel over I2C, plus framing.
+        n = max(self.updates, 1)
+        return "display %s: %d updates, %d us/update, %d px/update, ~%d B/update" % (
+            self.renderer, self.updates, self.update_ns // n // 1000,
+            self.dirty_px // n, self.dirty_px // n // 8)
@@ -0,0 +1,349 @@
+# Chord engine: resolves the scanned key state into keystrokes, layers, mouse
+# actions, word completion, hold-tap modifiers and hold-to-repeat, or in steno
+# mode into whole strokes for the multi-stroke dictionary.
+
+import time
+
+import c7k_keymap
+
+# —— Chord Timing ——
+MIN_HOLD     = 0.01
+COMBO_WINDOW = 0.01
+COOLDOWN     = 0.01
+RELEASE_WIN  = 0.01
+
+STROKE_SKIP = 1 << 14       # steno: ignore the stroke still held when the mode changes
+
+
+class ChordEngine:
+    def __init__(self, scanner, keyboard, mouse, display, stats, completer=None):
+        self.scanner = scanner
+        self.keyboard = keyboard
+        self.mouse = mouse
+        self.display = display
+        self.stats = stats
+        self.completer = completer
+        self.keymap = c7k_keymap
+        self.on_host = None     # called with the slot index of a host chord
+        self.on_hud = None      # called when the HUD chord is pressed
+        self.trace = None       # c7k_trace.Tracer when tracing is enabled
+        self.steno = None       # c7k_steno.StenoTranslator when a dictionary is loaded
+
+        self.min_hold = MIN_HOLD
+        self.combo_window = COMBO_WINDOW
+        self.cooldown = COOLDOWN
+        self.release_win = RELEASE_WIN
+
+        self.pending_combo = None
+        self.last_hold_time = 0
+        self.last_release_time = 0
+        self.last_combo_time = 0
+        self.next_repeat_time = 0
+        self.modifier_armed = False
+        self.held_modifier = None
+        self.mouse_armed = False
+
+        # Hold-tap: key deferred until tap or hold is known, key acting as a
+        # live modifier, last tap (for quick-tap-then-hold)
+        self.tap_candidate = None
+        self.hold_key = None
+        self.tap_held = None
+        self.tap_key = None
+        self.tap_at = 0
+
+        self.steno_on = False
+        self.stroke = 0
+
+        self.word_prefix = ""
+        self.suggestion = ""
+
+    # —— Word Completion ——
+    def update_suggestion(self):
+        if self.completer and self.word_prefix:
+            self.suggestion = self.completer.complete(self.word_prefix.encode())
+        else:
+            self.suggestion = ""
+        self.display.show_hint(self.word_prefix + self.suggestion if self.suggestion else "")
+
+    def track_word(self, key):
+        ch = self.keymap.KEYCODE_CHAR.get(key)
+        if key == self.keymap.Keycode.BACKSPACE:
+            self.word_prefix = self.word_prefix[:-1]
+        elif ch and ch.isalpha():
+            self.word_prefix += ch.lower()
+        else:
+            self.word_prefix = ""
+        self.update_suggestion()
+
+    def accept_completion(self):
+        if not self.suggestion:
+            return
+        char_keycode = self.keymap.CHAR_KEYCODE
+        for ch in self.suggestion:
+            self.keyboard.press(char_keycode[ch.upper()])
+            self.keyboard.release_all()
+        self.word_prefix += self.suggestion
+        self.display.update(self.suggestion.upper())
+        self.update_suggestion()
+
+    # —— Hold-Tap ——
+    def hold_tap(self, combo, now):
+        """Tap/hold decisions for km.hold_tap keys; True if combo was consumed."""
+        km = self.keymap
+        down_at = self.scanner.down_at
+        k = self.hold_key
+        if k is None:
+            if self.tap_held is not None or self.modifier_armed or self.mouse_armed:
+                return False
+            keys = [i for i in combo if i in km.hold_tap]
+            if not keys:
+                self.tap_candidate = None
+                return False
+            k = min(keys, key=lambda i: down_at[i])
+            if combo == (k,):
+                if self.pending_combo is not None:
+                    return False    # last key of a chord being released
+                if self.tap_key == k and down_at[k] - self.tap_at <= km.QUICK_TAP_TERM:
+                    self.tap_held = k
+                    return False
+                if now - down_at[k] < km.HOLD_TERM:
+                    self.tap_candidate = k
+                    return True
+            elif self.tap_candidate != k or min(down_at[i] for i in combo if i != k) - down_at[k] < km.HOLD_TERM:
+                self.tap_candidate = None
+                return False
+            self.tap_candidate = None
+            self.hold_key = k
+            self.pending_combo = None; self.last_hold_time = 0
+        elif k not in combo:
+            self.hold_key = None
+            return False
+        rest = tuple(i for i in combo if i != k)
+        if not rest:
+            self.pending_combo = None; self.last_hold_time = 0
+            return True
+        if self.last_hold_time == 0:
+            self.last_hold_time = now
+        if (now - self.last_hold_time >= self.min_hold and rest in km.chords and rest != self.pending_combo
+                and (self.pending_combo is None or now - self.last_combo_time <= self.combo_window)):
+            self.send_chord(km.chords[rest], self.scanner.mask, now, km.hold_tap[k])
+            self.pending_combo = rest; self.last_combo_time = now
+            if rest in km.repeat_chords:
+                self.next_repeat_time = now + km.repeat_chords[rest][0]
+        elif rest == self.pending_combo and rest in km.repeat_chords:
+            self.repeat_chord(rest, now, km.hold_tap[k])
+        return True
+
+    def send_chord(self, key, mask, now, modifier=None):
+        km = self.keymap
+        if self.trace: self.trace.chord(mask, key)
+        if modifier:
+            self.keyboard.press(modifier, key)
+        else:
+            self.keyboard.press(key)
+        self.keyboard.release_all()
+        if modifier == km.Keycode.LEFT_SHIFT and key in km.SHIFT_NUM_SYMBOLS:
+            ch = km.SHIFT_NUM_SYMBOLS[key]
+        else:
+            ch = km.key_to_char(key)
+        self.stats.record(mask, now)
+        self.track_word(None if modifier else key)
+        self.display.update(ch)
+        time.sleep(self.cooldown)
+
+    def repeat_chord(self, combo, now, modifier=None):
+        """Hold-to-repeat for a chord still held after its first send."""
+        km = self.keymap
+        if now < self.next_repeat_time:
+            return
+        key = km.chords[combo]
+        if self.trace: self.trace.chord(self.scanner.mask, key)
+        if modifier:
+            self.keyboard.send(modifier, key)
+        else:
+            self.keyboard.send(key)
+        self.track_word(None if modifier else key)
+        interval = km.repeat_chords[combo][1]
+        self.next_repeat_time += interval
+        if self.next_repeat_time < now:
+            self.next_repeat_time = now + interval
+
+    # —— Steno Strokes ——
+    def toggle_steno(self):
+        self.steno_on = not self.steno_on
+        self.stroke = STROKE_SKIP if self.steno_on else 0
+        self.pending_combo = None; self.last_hold_time = 0
+        self.modifier_armed = self.mouse_armed = False; self.held_modifier = None
+        self.tap_candidate = self.hold_key = self.tap_held = None
+        self.display.show_hint("STENO" if self.steno_on else "")
+
+    def steno_scan(self, now):
+        mask = self.scanner.mask
+        if mask:
+            self.stroke |= mask
+            self.steno.drain()
+            return
+        stroke = self.stroke
+        self.stroke = 0
+        steno = self.steno
+        if stroke and not stroke & STROKE_SKIP:
+            km = self.keymap
+            combo = tuple(i for i in range(km.KEYS) if stroke >> i & 1)
+            if combo == km.steno_chord:
+                steno.flush()
+                self.toggle_steno()
+                return
+            if combo in km.host_chords:
+                if self.on_host:
+                    self.on_host(km.host_chords[combo])
+            elif combo == km.hud_chord:
+                if self.on_hud:
+                    self.on_hud()
+            elif combo == km.steno_undo:
+                steno.undo()
+            else:
+                steno.stroke(stroke, now)
+            self.stats.record(stroke, now)
+        steno.poll(now)
+        steno.drain()
+
+    # —— Chord Processing ——
+    def pressed_together(self, combo):
+        """True if every key of combo went down within combo_window. Host, HUD
+        and steno chords contain a trigger chord; rolling into them from the
+        trigger must not switch hosts or modes."""
+        down_at = self.scanner.down_at
+        first = last = down_at[combo[0]]
+        for i in combo:
+            t = down_at[i]
+            if t < first: first = t
+            if t > last: last = t
+        return last - first <= self.combo_window
+
+    def check_chords(self):
+        km = self.keymap
+        keyboard = self.keyboard
+        update_display = self.display.update
+        now = time.monotonic()
+        if self.steno_on:
+            self.steno_scan(now)
+            return
+        combo = tuple(i for i, d in enumerate(self.scanner.pressed) if d)
+
+        if combo:
+            # Every key of the last chord is up: it was released, even though
+            # the next one is already landing (the split half's release
+            # arrives a link delay after this board's next press)
+            pending = self.pending_combo
+            if pending is not None and not any(self.scanner.pressed[i] for i in pending):
+                self.pending_combo = None; self.last_hold_time = 0
+            if km.hold_tap and self.hold_tap(combo, now):
+                return
+            if self.last_hold_time == 0:
+                self.last_hold_time = now
+            if now - self.last_hold_time >= self.min_hold:
+                # Host slot switch; layer and modifier state carry over
+                if combo in km.host_chords and self.pressed_together(combo):
+                    if combo != self.pending_combo and self.on_host:
+                        self.on_host(km.host_chords[combo])
+                    self.pending_combo = combo; self.last_combo_time = now
+                    return
+                # Steno mode toggle
+                if combo == km.steno_chord and self.steno and self.pressed_together(combo):
+                    if combo != self.pending_combo:
+                        self.toggle_steno()
+                    return
+                # Typing HUD toggle
+                if combo == km.hud_chord and self.pressed_together(combo):
+                    if combo != self.pending_combo and self.on_hud:
+                        self.on_hud()
+                    self.pending_combo = combo; self.last_combo_time = now
+                    return
+                # Modifier layer arm
+                if combo == km.mod_trigger:
+                    self.modifier_armed = True; self.mouse_armed = False; self.held_modifier = None
+                    self.pending_combo = combo; self.last_combo_time = now
+                    return
+                # Mouse layer toggle
+                if combo == km.mouse_trigger:
+                    self.mouse_armed = not self.mouse_armed; self.modifier_armed = False; self.held_modifier = None
+                    self.pending_combo = combo; self.last_combo_time = now
+                    return
+                # Mouse movement
+                if self.mouse_armed and combo != self.pending_combo:
+                    dx = dy = 0
+                    if combo == (0,): dy = -10
+                    elif combo == (1,): dx =  10
+                    elif combo == (2,): dx = -10
+                    elif combo == (3,): dy =  10
+                    if dx or dy:
+                        self.mouse.move(dx, dy)
+                        self.pending_combo = combo; self.last_combo_time = now
+                        update_display('?')
+                        time.sleep(self.cooldown)
+                        return
+                # Mouse button clicks
+                if self.mouse_armed and combo in km.mouse_button_chords:
+                    self.mouse.click(km.mouse_button_chords[combo])
+                    self.pending_combo = combo; self.last_combo_time = now
+                    update_display('?')
+                    time.sleep(self.cooldown)
+                    return
+                # Pick modifier
+                if self.modifier_armed and self.held_modifier is None and combo in km.modifier_chords:
+                    self.held_modifier = km.modifier_chords[combo]
+                    self.pending_combo = combo; self.last_combo_time = now
+                    update_display(km.MODIFIER_CHAR.get(self.held_modifier, '?'))
+                    return
+                # Modifier + key
+                if self.modifier_armed and self.held_modifier and combo in km.chords:
+                    key = km.chords[combo]
+                    if self.trace: self.trace.chord(self.scanner.mask, key)
+                    keyboard.press(self.held_modifier, key)
+                    keyboard.release_all()
+                    if self.held_modifier == km.Keycode.LEFT_SHIFT and key in km.SHIFT_NUM_SYMBOLS:
+                        ch = km.SHIFT_NUM_SYMBOLS[key]
+                    else:
+                        ch = km.key_to_char(key)
+                    self.modifier_armed = False; self.held_modifier = None
+                    self.pending_combo = combo; self.last_combo_time = now
+                    self.stats.record(self.scanner.mask, now)
+                    self.track_word(None)
+                    update_display(ch); time.sleep(self.cooldown); return
+                # Accept word completion
+                if not self.modifier_armed and not self.mouse_armed and combo == km.complete_chord:
+                    if combo != self.pending_combo:
+                        if self.trace: self.trace.chord(self.scanner.mask, 0)
+                        self.accept_completion()
+                        self.stats.record(self.scanner.mask, now)
+                        self.pending_combo = combo; self.last_combo_time = now
+                    return
+                # Hold-to-repeat
+                if (not self.modifier_armed and not self.mouse_armed
+                        and combo == self.pending_combo and combo in km.repeat_chords):
+                    self.repeat_chord(combo, now)
+                    return
+                # Normal chord
+                if not self.modifier_armed and not self.mouse_armed and combo in km.chords:
+                    if self.pending_combo is None or (now - self.last_combo_time) <= self.combo_window:
+                        if combo != self.pending_combo:
+                            key = km.chords[combo]
+                            if self.trace: self.trace.chord(self.scanner.mask, key)
+                            keyboard.press(key); keyboard.release_all()
+                            ch = km.key_to_char(key)
+                            self.pending_combo = combo; self.last_combo_time = now
+                            self.stats.record(self.scanner.mask, now)
+                            if combo in km.repeat_chords:
+                                self.next_repeat_time = now + km.repeat_chords[combo][0]
+                            self.track_word(key)
+                            update_display(ch); time.sleep(self.cooldown)
+        else:
+            if self.tap_candidate is not None:
+                k = self.tap_candidate
+                self.tap_candidate = None
+                if (k,) in km.chords:
+                    self.send_chord(km.chords[(k,)], 1 << k, now)
+                self.tap_key = k; self.tap_at = now
+            self.hold_key = self.tap_held = None
+            if self.last_release_time == 0 or (now - self.last_release_time) >= self.release_win:
+                self.pending_combo = None; self.last_hold_time = 0; self.last_release_time = now
@@ -0,0 +1,54 @@
+# Shared reader for the flat, offset-linked dictionaries built by tools/
+# (the completion trie in c7k_complete, the steno dictionary in c7k_steno).
+#
+# Common layout (little endian):
+#   header : 4-byte magic | u8 version | u24 root offset
+#   node   : u8 n_edges | u24 value offset (0xFFFFFF = none) | n_edges * edge
+# Files up to RAM_LIMIT are read into one buffer; larger ones stay on flash
+# and each read fills a preallocated scratch buffer, so lookups create no
+# Python objects per node either way.
+
+NONE = 0xFFFFFF
+RAM_LIMIT = 32768
+
+
+def u24(mv, o):
+    return mv[o] | (mv[o + 1] << 8) | (mv[o + 2] << 16)
+
+
+class FlatFile:
+    MAGIC = b""
+    VERSION = 1
+    SCRATCH = 4             # bytes for the largest single read from flash
+    KIND = "c7k file"
+
+    def __init__(self, buf=None, file=None):
+        self.file = file
+        self.scratch = memoryview(bytearray(self.SCRATCH))
+        self.mv = memoryview(buf) if buf is not None else None
+        head = self._read(0, 8)
+        if bytes(head[0:4]) != self.MAGIC or head[4] != self.VERSION:
+            raise ValueError("not a " + self.KIND)
+        self.root = u24(head, 5)
+
+    def _read(self, off, n):
+        if self.mv is not None:
+            return self.mv[off:off + n]
+        self.file.seek(off)
+        self.file.readinto(self.scratch[0:n])
+        return self.scratch
+
+
+def load_flat(path, cls):
+    """Return cls over the file at path (in RAM or on flash), or None."""
+    try:
+        f = open(path, "rb")
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size <= RAM_LIMIT:
+            buf = f.read()
+            f.close()
+            return cls(buf)
+        return cls(file=f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,120 @@
+# Multi-host BLE slots. Each slot advertises under its own static random
+# identity address, so every host bonds with a different "device" and
+# CircuitPython's bonding store keeps one set of keys per slot. Switching
+# drops the current link, takes on the slot's identity and advertises fast
+# until that slot's host reconnects.
+#
+# nvm image (little endian):
+#   header : b"C7KH" | u8 version | u8 active slot
+#   slots  : SLOTS * (6-byte identity address | u8 flags | u8 reserved)
+
+import struct
+import time
+
+import _bleio
+
+MAGIC = b"C7KH"
+VERSION = 1
+SLOTS = 3
+SLOT_SIZE = 8
+IMAGE_SIZE = 6 + SLOTS * SLOT_SIZE
+FLAG_BONDED = 0x01          # a host has connected under this identity
+FAST_INTERVAL = 0.02        # advertising interval while switching
+SWITCH_TIMEOUT = 30.0
+
+
+class HostSlots:
+    def __init__(self, ble, transport, nvm=None, offset=0, adapter=None):
+        self.ble = ble
+        self.transport = transport
+        self.nvm = nvm
+        self.offset = offset
+        self.adapter = adapter or _bleio.adapter
+        self.active = 0
+        self.flags = bytearray(SLOTS)
+        self.identities = [self.derive(i) for i in range(SLOTS)]
+        self.switching = False
+        self.switch_start = 0
+        self.switch_ms = 0
+        self.switches = 0
+        self.load()
+        self.apply(self.active)
+
+    # —— Identity ——
+    def derive(self, slot):
+        addr = bytearray(self.adapter.address.address_bytes)
+        addr[0] ^= slot
+        addr[5] |= 0xC0     # static random: two most significant bits set
+        return bytes(addr)
+
+    def apply(self, slot):
+        self.adapter.address = _bleio.Address(self.identities[slot], _bleio.Address.RANDOM_STATIC)
+        self.ble.name = "c7k-%d" % (slot + 1)
+
+    # —— Persistence ——
+    def load(self):
+        if self.nvm is None:
+            return
+        o = self.offset
+        magic, version, active = struct.unpack("<4sBB", bytes(self.nvm[o:o + 6]))
+        if magic != MAGIC or version != VERSION or active >= SLOTS:
+            return
+        self.active = active
+        for i in range(SLOTS):
+            base = o + 6 + i * SLOT_SIZE
+            self.identities[i] = bytes(self.nvm[base:base + 6])
+            self.flags[i] = self.nvm[base + 6]
+
+    def save(self):
+        if self.nvm is None:
+            return
+        img = bytearray(IMAGE_SIZE)
+        struct.pack_into("<4sBB", img, 0, MAGIC, VERSION, self.active)
+        for i in range(SLOTS):
+            base = 6 + i * SLOT_SIZE
+            img[base:base + 6] = self.identities[i]
+            img[base + 6] = self.flags[i]
+        o = self.offset
+        if self.nvm[o:o + IMAGE_SIZE] != img:
+            self.nvm[o:o + IMAGE_SIZE] = img
+
+    # —— Switching ——
+    def select(self, slot):
+        """Switch to slot; returns False if it is already the connected slot."""
+        if slot >= SLOTS or (slot == self.active and self.transport.host_connected()):
+            return False
+        self.switch_start = time.monotonic()
+        self.switching = True
+        self.transport.release_all()
+        for conn in self.ble.connections:
+            if conn not in self.transport.peers:
+                conn.disconnect()
+        if self.ble.advertising:
+            self.ble.stop_advertising()
+        self.active = slot
+        self.apply(slot)
+        self.transport.adv_interval = FAST_INTERVAL
+        self.save()
+        return True
+
+    def poll(self, now):
+        """Finish a pending switch; returns True once the slot's host is back."""
+        connected = self.transport.host_connected()
+        if connected and not self.flags[self.active] & FLAG_BONDED:
+            self.flags[self.active] |= FLAG_BONDED
+            self.save()
+        if not self.switching:
+            return False
+        if connected:
+            self.switch_ms = int((now - self.switch_start) * 1000)
+            self.switching = False
+            self.switches += 1
+            self.transport.adv_interval = self.transport.ADV_INTERVAL
+            return True
+        if now - self.switch_start >= SWITCH_TIMEOUT:
+            self.switching = False
+            self.transport.adv_interval = self.transport.ADV_INTERVAL
+        return False
+
+    def summary(self):
+        return "host %d/%d switches=%d last=%dms" % (self.active + 1, SLOTS, self.switches, self.switch_ms)
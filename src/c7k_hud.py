@@ -0,0 +1,145 @@
+# Typing HUD: a status screen fed from running counters, toggled by hud_chord.
+#
+#   big row : gross words per minute over the last WINDOW seconds ("  62W")
+#   hint row: p95 press-to-report latency, layer/modifier icons, link state
+#             e.g. "p95 61ms ^S M  BLE2"
+#
+# Counters are updated from the main loop after every scan (a few integer
+# compares); the screen is recomputed and redrawn every REFRESH seconds, and
+# only while it is shown. Latency runs from the scan that saw the first key of
+# a press to the first HID report of that press, so it includes min_hold.
+
+import array
+import time
+
+REFRESH = 1.0
+BUCKET = 5.0                # seconds per keystroke bucket
+BUCKETS = 12                # WINDOW = 60 s
+WINDOW = BUCKET * BUCKETS
+SAMPLES = 32                # latency samples kept for the percentile
+CHARS_PER_WORD = 5
+
+
+class TypingHUD:
+    def __init__(self, display, engine, transport, hosts=None, now=0):
+        self.display = display
+        self.engine = engine
+        self.transport = transport
+        self.hosts = hosts
+        self.shown = False
+        self.next_refresh = 0
+        self.status = None
+        # Keystrokes per bucket, rotated on refresh
+        self.buckets = array.array("H", [0] * BUCKETS)
+        self.bucket = 0
+        self.bucket_start = now
+        self.started = now
+        self.seen_keys = transport.keystrokes
+        # Press-to-report latency ring, in ms
+        self.latency = array.array("H", [0] * SAMPLES)
+        self.samples = 0
+        self.pressed = False
+        self.down_ns = 0
+        self.link = None
+
+    # —— Counters (every scan) ——
+    def observe(self, mask):
+        link = self.transport.active
+        if self.down_ns and link is self.link and link.first_ns:
+            ms = (link.first_ns - self.down_ns) // 1000000
+            self.latency[self.samples % SAMPLES] = min(ms, 0xFFFF)
+            self.samples += 1
+            self.down_ns = 0
+        if not mask:
+            self.pressed = False
+            self.down_ns = 0
+        elif not self.pressed:
+            self.pressed = True
+            self.down_ns = time.monotonic_ns()
+            self.link = link
+            link.mark()
+
+    def count(self, now):
+        keys = self.transport.keystrokes
+        while now - self.bucket_start >= BUCKET:
+            self.bucket = (self.bucket + 1) % BUCKETS
+            self.buckets[self.bucket] = 0
+            self.bucket_start += BUCKET
+            if now - self.bucket_start >= WINDOW:
+                self.bucket_start = now
+                for i in range(BUCKETS):
+                    self.buckets[i] = 0
+        self.buckets[self.bucket] = min(self.buckets[self.bucket] + keys - self.seen_keys, 0xFFFF)
+        self.seen_keys = keys
+
+    # —— Derived values ——
+    def wpm(self, now):
+        span = min(WINDOW, max(now - self.started, BUCKET))
+        return int(sum(self.buckets) / CHARS_PER_WORD * 60 / span)
+
+    def p95(self):
+        n = min(self.samples, SAMPLES)
+        if not n:
+            return None
+        return sorted(self.latency[:n])[min(n - 1, n * 95 // 100)]
+
+    def icons(self):
+        e = self.engine
+        km = e.keymap
+        out = ""
+        if e.modifier_armed:
+            out += "^" + km.MODIFIER_CHAR.get(e.held_modifier, "")
+        if e.hold_key is not None:
+            out += " +" + km.MODIFIER_CHAR.get(km.hold_tap[e.hold_key], "?")
+        if e.mouse_armed:
+            out += " M"
+        if e.steno_on:
+            out += " ST"
+        return out.strip()
+
+    def link_state(self):
+        t = self.transport
+        if self.hosts is not None and self.hosts.switching:
+            return "SW%d" % (self.hosts.active + 1)
+        if not t.connected:
+            return "ADV"
+        if t.active.name == "USB":
+            return "USB"
+        return "BLE%d" % (self.hosts.active + 1) if self.hosts is not None else "BLE"
+
+    def render(self, now):
+        p95 = self.p95()
+        hint = "%s %-5s %s" % ("p95 %2dms" % p95 if p95 is not None else "p95  --", self.icons(),
+                               self.link_state())
+        return "%4dW" % min(self.wpm(now), 9999), hint
+
+    # —— Screen ——
+    def tick(self, now):
+        """Roll the counters and redraw the status screen every REFRESH seconds."""
+        if now < self.next_refresh:
+            return
+        self.next_refresh = now + REFRESH
+        self.count(now)
+        if self.shown:
+            status = self.render(now)
+            if status != self.status:
+                self.status = status
+                self.display.show_status(status, wake=False)
+
+    def toggle(self):
+        self.shown = not self.shown
+        self.status = None
+        if self.shown:
+            now = time.monotonic()
+            self.count(now)
+            self.status = self.render(now)
+            self.next_refresh = now + REFRESH
+        self.display.show_status(self.status, wake=True)
+
+    def summary(self):
+        now = time.monotonic()
+        self.count(now)
+        p95 = self.p95()
+        return "hud %s: %d wpm over %ds, p95 %s ms (%d presses), %s %s" % (
+            "on" if self.shown else "off", self.wpm(now), WINDOW,
+            p95 if p95 is not None else "-", self.samples, self.icons() or "-", self.link_state())
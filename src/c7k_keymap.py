@@ -0,0 +1,148 @@
+# Chord tables for the c7k: chord → keycode, layer triggers and display characters.
+# Keys 0..6 are this board's; 7..13 are the secondary half of a wireless split
+# (same finger order), so chords may use either hand or both.
+
+from adafruit_hid.keycode import Keycode
+from adafruit_hid.mouse import Mouse
+
+KEYS = 14
+
+# —— Keycode → ASCII Map ——
+KEYCODE_CHAR = {}
+for i in range(26):
+    c = chr(ord('A') + i)
+    KEYCODE_CHAR[getattr(Keycode, c)] = c
+nums = ['ZERO','ONE','TWO','THREE','FOUR','FIVE','SIX','SEVEN','EIGHT','NINE']
+for digit, name in zip('0123456789', nums):
+    KEYCODE_CHAR[getattr(Keycode, name)] = digit
+KEYCODE_CHAR[Keycode.SPACE] = ' '
+KEYCODE_CHAR[Keycode.ENTER] = '\n'
+
+CHAR_KEYCODE = {c: kc for kc, c in KEYCODE_CHAR.items()}
+
+def key_to_char(kc):
+    return KEYCODE_CHAR.get(kc, '?')
+
+# —— Shift + Number → Symbol Map ——
+SHIFT_NUM_SYMBOLS = {
+    Keycode.ONE:   '!',
+    Keycode.TWO:   '@',
+    Keycode.THREE: '#',
+    Keycode.FOUR:  '$',
+    Keycode.FIVE:  '%',
+    Keycode.SIX:   '^',
+    Keycode.SEVEN: '&',
+    Keycode.EIGHT: '*',
+    Keycode.NINE:  '(',
+    Keycode.ZERO:  ')'
+}
+
+# —— Mouse Button Chords ——
+mouse_button_chords = {
+    (0, 1): Mouse.LEFT_BUTTON,     # Pinky + Ring → left-click
+    (2, 3): Mouse.RIGHT_BUTTON,    # Middle + Index → right-click
+    (1, 2): Mouse.MIDDLE_BUTTON,   # Ring + Middle → middle-click
+    (0, 4): Mouse.BACK_BUTTON,     # Pinky + Thumb → “back” button
+    (3, 4): Mouse.FORWARD_BUTTON   # Index + Thumb → “forward” button
+}
+
+# —— Modifier Layer ——
+mod_trigger      = (5, 6)
+modifier_chords  = {
+    (0,): Keycode.LEFT_SHIFT,
+    (1,): Keycode.LEFT_CONTROL,
+    (2,): Keycode.LEFT_ALT,
+    (3,): Keycode.LEFT_GUI
+}
+MODIFIER_CHAR = {
+    Keycode.LEFT_SHIFT: 'S',
+    Keycode.LEFT_CONTROL: 'C',
+    Keycode.LEFT_ALT: 'A',
+    Keycode.LEFT_GUI: 'G'
+}
+
+mouse_trigger  = (4, 5)
+complete_chord = (4, 6)
+
+# —— Host Slots: thumb pair + finger picks the BLE host ——
+host_chords = {
+    (0, 4, 5): 0,
+    (1, 4, 5): 1,
+    (2, 4, 5): 2
+}
+
+# —— Typing HUD toggle (status screen on the OLED) ——
+hud_chord = (3, 4, 5)
+
+# —— Steno Mode: strokes go through the multi-stroke dictionary (/steno.c7kd) ——
+steno_chord = (4, 5, 6)      # toggles steno mode
+steno_undo  = (6,)           # in steno mode, retracts the last translation
+
+# —— Hold-Tap: a key held alone past HOLD_TERM becomes a live modifier for
+#    the chords the other fingers make; tapped, it is its own chord (sent on
+#    release). Tap then re-press within QUICK_TAP_TERM to hold the tap itself.
+#    (6,) stays plain so BACKSPACE repeats on a simple hold; a config can
+#    add it ({"6": "LEFT_ALT"}) or turn a key off ({"4": null}). ——
+HOLD_TERM      = 0.20
+QUICK_TAP_TERM = 0.20
+hold_tap = {
+    5: Keycode.LEFT_SHIFT,
+    4: Keycode.LEFT_CONTROL
+}
+
+# Hold-to-repeat: chord → (initial delay, repeat interval), timed off the scan clock
+REPEAT_DELAY    = 0.40
+REPEAT_INTERVAL = 0.05
+repeat_chords   = {
+    (6,):         (REPEAT_DELAY, REPEAT_INTERVAL),   # BACKSPACE
+    (0,1,3):      (REPEAT_DELAY, REPEAT_INTERVAL),   # BACKSPACE
+    (1,2,6):      (REPEAT_DELAY, REPEAT_INTERVAL),   # BACKSPACE
+    (0,1,3,5):    (REPEAT_DELAY, REPEAT_INTERVAL),   # DELETE
+    (0,3,4):      (REPEAT_DELAY, REPEAT_INTERVAL),   # UP
+    (0,1,2,3,4):  (REPEAT_DELAY, REPEAT_INTERVAL),   # DOWN
+    (0,1,3,4):    (REPEAT_DELAY, REPEAT_INTERVAL),   # RIGHT
+    (0,2,3,4):    (REPEAT_DELAY, REPEAT_INTERVAL),   # LEFT
+    (7,):         (REPEAT_DELAY, REPEAT_INTERVAL),   # LEFT (split half)
+    (8,):         (REPEAT_DELAY, REPEAT_INTERVAL),   # DOWN (split half)
+    (9,):         (REPEAT_DELAY, REPEAT_INTERVAL),   # UP (split half)
+    (10,):        (REPEAT_DELAY, REPEAT_INTERVAL),   # RIGHT (split half)
+    (13,):        (REPEAT_DELAY, REPEAT_INTERVAL),   # BACKSPACE (split half)
+}
+
+chords = {
+    (0,): Keycode.E,   (1,): Keycode.I,    (2,): Keycode.A,
+    (3,): Keycode.S,   (4,): Keycode.SPACE,(0,1): Keycode.R,
+    (0,2): Keycode.O,  (0,3): Keycode.C,    (1,2): Keycode.N,
+    (1,3): Keycode.L,  (2,3): Keycode.T,    (0,5): Keycode.M,
+    (1,5): Keycode.G,  (2,5): Keycode.H,    (3,5): Keycode.B,
+    (0,6): Keycode.SPACE,
+    (0,1,5): Keycode.Y,(0,2,5): Keycode.W,  (0,3,5): Keycode.X,
+    (1,2,5): Keycode.F,(1,3,5): Keycode.K,  (2,3,5): Keycode.V,
+    (0,1,2): Keycode.D,(1,2,3): Keycode.P,
+    (0,1,2,5): Keycode.J,(1,2,3,5): Keycode.Z,
+    (0,1,2,3): Keycode.U,(0,1,2,3,5): Keycode.Q,
+    (0,1,3,5): Keycode.DELETE,
+    (0,4): Keycode.ONE,(1,4): Keycode.TWO,  (2,4): Keycode.THREE,
+    (3,4): Keycode.FOUR,(0,1,4): Keycode.FIVE,(1,2,4): Keycode.SIX,
+    (2,3,4): Keycode.SEVEN,(0,2,4): Keycode.EIGHT,(1,3,4): Keycode.NINE,
+    (0,1,3): Keycode.BACKSPACE,
+    (0,2,3): Keycode.SPACE,
+    (0,3,4): Keycode.UP_ARROW,
+    (0,1,2,4): Keycode.ZERO,
+    (0,1,3,4): Keycode.RIGHT_ARROW,
+    (0,2,3,4): Keycode.LEFT_ARROW,
+    (1,2,3,4): Keycode.ESCAPE,
+    (0,1,2,3,4): Keycode.DOWN_ARROW,
+    (6,): Keycode.BACKSPACE,
+    (1,6): Keycode.TAB,   (2,6): Keycode.PERIOD, (3,6): Keycode.MINUS,
+    (2,3,6): Keycode.FORWARD_SLASH,
+    (0,1,6): Keycode.ENTER,(0,2,6): Keycode.COMMA,
+    (1,3,6): Keycode.LEFT_BRACKET,(0,3,6): Keycode.RIGHT_BRACKET,
+    (1,2,3,6): Keycode.BACKSLASH,(1,2,6): Keycode.BACKSPACE,
+    (0,1,3,6): Keycode.QUOTE,(0,2,3,6): Keycode.SEMICOLON,
+    (0,1,2,3,6): Keycode.GRAVE_ACCENT,
+    # Secondary split half: navigation under the fingers, editing on the thumbs
+    (7,): Keycode.LEFT_ARROW,(8,): Keycode.DOWN_ARROW,(9,): Keycode.UP_ARROW,
+    (10,): Keycode.RIGHT_ARROW,(11,): Keycode.SPACE,(12,): Keycode.ENTER,
+    (13,): Keycode.BACKSPACE
+}
@@ -0,0 +1,231 @@
+# Lightweight SSD1306 backend: a 1 KB page-ordered framebuffer written straight
+# over I2C, without displayio. Only the column span of each page that changed
+# is sent. Same update()/show_hint()/tick() interface as c7k_display.Display.
+
+import array
+import time
+
+import terminalio
+from adafruit_bus_device.i2c_device import I2CDevice
+
+from c7k_display import CELLS, SCALE, TILE_MODE, DIM_AFTER, OFF_AFTER
+
+WIDTH = 128
+PAGES = 8                   # 64 rows, 8 rows per page
+TEXT_PAGE = 2               # 4x text row occupies pages 2..7
+HINT_ROW = 2                # hint line pixel rows 2..13 (pages 0..1)
+CONTRAST = 0xCF
+DIM_CONTRAST = 0x01
+FIRST, LAST = 32, 126       # printable ASCII kept in the boot-time font
+
+INIT = (
+    0xAE,               # display off
+    0xD5, 0x80,         # clock divide
+    0xA8, 0x3F,         # multiplex 64
+    0xD3, 0x00,         # display offset
+    0x40,               # start line 0
+    0x8D, 0x14,         # charge pump on
+    0x20, 0x00,         # horizontal addressing; windows set with 0x21/0x22
+    0xA1, 0xC8,         # segment remap, COM scan descending
+    0xDA, 0x12,         # COM pins
+    0x81, CONTRAST,
+    0xD9, 0xF1,         # precharge
+    0xDB, 0x40,         # VCOMH
+    0xA4, 0xA6,         # resume from RAM, normal (not inverted)
+    0xAF,               # display on
+)
+
+
+def build_font(font):
+    """Column bitmaps for ASCII 32..126: 6 columns per glyph, bit n = row n."""
+    w, h = font.get_bounding_box()[:2]
+    cols = array.array("H", bytes(2 * w * (LAST - FIRST + 1)))
+    for cp in range(FIRST, LAST + 1):
+        g = font.get_glyph(cp)
+        if g is None:
+            continue
+        src = g.bitmap
+        per_row = src.width // g.width
+        sx = (g.tile_index % per_row) * g.width
+        sy = (g.tile_index // per_row) * g.height
+        base = (cp - FIRST) * w
+        for x in range(min(g.width, w)):
+            v = 0
+            for y in range(min(g.height, h, 16)):
+                if src[sx + x, sy + y]:
+                    v |= 1 << y
+            cols[base + x] = v
+    return cols, w, h
+
+
+class FrameBufferDisplay:
+    def __init__(self, i2c, address=0x3C):
+        self.dev = I2CDevice(i2c, address)
+        self.font, self.gw, self.gh = build_font(terminalio.FONT)
+        self.buf = bytearray(WIDTH * PAGES)
+        # Dirty column span per page; lo > hi means clean
+        self.lo = bytearray(b"\xff" * PAGES)
+        self.hi = bytearray(PAGES)
+        self.out = bytearray(WIDTH + 1)
+        self.out[0] = 0x40
+        self.window = bytearray((0x00, 0x21, 0, 0, 0x22, 0, 0))
+        self.cells = [" "] * CELLS
+        self.hint_text = ""
+        self.text_buffer = ""
+        self.cursor = 0
+        self.updates = 0
+        self.update_ns = 0
+        self.bytes_sent = 0
+        self.flushes = 0
+        self.last_active = time.monotonic()
+        self.idle_state = 0     # 0 on, 1 dimmed, 2 off
+        self.command(*INIT)
+        self.mark(0, PAGES - 1, 0, WIDTH - 1)
+        self.flush()
+        self.boot_bytes = self.bytes_sent
+
+    # —— I2C ——
+    def command(self, *cmds):
+        buf = bytearray(1 + len(cmds))
+        buf[1:] = bytes(cmds)
+        with self.dev as d:
+            d.write(buf)
+        self.bytes_sent += len(buf)
+
+    def flush(self):
+        """Send the dirty column span of each changed page."""
+        buf, out, window = self.buf, self.out, self.window
+        sent = 0
+        for p in range(PAGES):
+            lo, hi = self.lo[p], self.hi[p]
+            if lo > hi:
+                continue
+            n = hi - lo + 1
+            window[2], window[3], window[5], window[6] = lo, hi, p, p
+            base = p * WIDTH + lo
+            out[1:n + 1] = buf[base:base + n]
+            with self.dev as d:
+                d.write(window)
+                d.write(out, end=n + 1)
+            sent += len(window) + n + 1
+            self.lo[p], self.hi[p] = 255, 0
+        if sent:
+            self.flushes += 1
+            self.bytes_sent += sent
+        return sent
+
+    def mark(self, p0, p1, x0, x1):
+        for p in range(p0, p1 + 1):
+            if x0 < self.lo[p]:
+                self.lo[p] = x0
+            if x1 > self.hi[p]:
+                self.hi[p] = x1
+
+    # —— Drawing ——
+    def glyph(self, ch):
+        cp = ord(ch) if len(ch) == 1 else 0
+        if not FIRST <= cp <= LAST:
+            cp = ord("?") if ch != "\n" else ord(" ")
+        return (cp - FIRST) * self.gw
+
+    def draw_big(self, cell, ch):
+        buf, font = self.buf, self.font
+        g = self.glyph(ch)
+        x0 = cell * self.gw * SCALE
+        for c in range(self.gw):
+            col = font[g + c]
+            v = 0
+            for y in range(self.gh):
+                if col >> y & 1:
+                    v |= 0xF << (4 * y)
+            for p in range(PAGES - TEXT_PAGE):
+                b = (v >> (8 * p)) & 0xFF
+                i = (TEXT_PAGE + p) * WIDTH + x0 + c * SCALE
+                buf[i] = buf[i + 1] = buf[i + 2] = buf[i + 3] = b
+        self.mark(TEXT_PAGE, PAGES - 1, x0, x0 + self.gw * SCALE - 1)
+
+    def draw_small(self, pos, ch):
+        buf, font = self.buf, self.font
+        g = self.glyph(ch)
+        x0 = pos * self.gw
+        for c in range(self.gw):
+            v = font[g + c] << HINT_ROW
+            buf[x0 + c] = v & 0xFF
+            buf[WIDTH + x0 + c] = (v >> 8) & 0xFF
+        self.mark(0, 1, x0, x0 + self.gw - 1)
+
+    def set_cell(self, i, ch):
+        if self.cells[i] == ch:
+            return 0
+        self.cells[i] = ch
+        self.draw_big(i, ch)
+        return 1
+
+    # —— c7k_display.Display interface ——
+    def update(self, msg):
+        t0 = time.monotonic_ns()
+        self.wake()
+        self.text_buffer += msg
+        if len(self.text_buffer) > CELLS:
+            self.text_buffer = self.text_buffer[-CELLS:]
+        if TILE_MODE == "scroll":
+            for i in range(CELLS):
+                self.set_cell(i, self.text_buffer[i] if i < len(self.text_buffer) else " ")
+        else:
+            for ch in msg:
+                self.set_cell(self.cursor, ch)
+                self.cursor = (self.cursor + 1) % CELLS
+            if msg:
+                self.set_cell(self.cursor, " ")
+        self.updates += 1
+        self.update_ns += time.monotonic_ns() - t0
+
+    def show_hint(self, text):
+        if self.hint_text != text:
+            self.wake()
+            self.draw_hint(text)
+
+    def draw_hint(self, text):
+        old = self.hint_text
+        n = min(max(len(old), len(text)), WIDTH // self.gw)
+        for i in range(n):
+            ch = text[i] if i < len(text) else " "
+            if i >= len(old) or old[i] != ch:
+                self.draw_small(i, ch)
+        self.hint_text = text
+
+    def redraw(self, text, hint, wake=True):
+        """Replace the whole screen (status screens, and restoring after one)."""
+        if wake:
+            self.wake()
+        text = text[-CELLS:]
+        self.text_buffer = text
+        for i in range(CELLS):
+            self.set_cell(i, text[i] if i < len(text) else " ")
+        self.cursor = len(text) % CELLS
+        if self.hint_text != hint:
+            self.draw_hint(hint)
+
+    def wake(self):
+        self.last_active = time.monotonic()
+        if self.idle_state:
+            self.command(0xAF, 0x81, CONTRAST)
+            self.idle_state = 0
+
+    def tick(self, now):
+        """Send pending pages and apply the idle dim/off policy."""
+        if self.idle_state < 2:
+            self.flush()
+        idle = now - self.last_active
+        if self.idle_state < 2 and idle >= OFF_AFTER:
+            self.command(0xAE)
+            self.idle_state = 2
+        elif self.idle_state < 1 and idle >= DIM_AFTER:
+            self.command(0x81, DIM_CONTRAST)
+            self.idle_state = 1
+
+    def summary(self):
+        n = max(self.updates, 1)
+        return "display framebuffer: %d updates, %d us/update, %d B/update, %d flushes" % (
+            self.updates, self.update_ns // n // 1000, (self.bytes_sent - self.boot_bytes) // n,
+            self.flushes)
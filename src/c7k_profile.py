@@ -0,0 +1,63 @@
+# On-device import profiler. Run it instead of code.py (or `import c7k_profile`
+# from the REPL) to measure the import time and heap cost of each module; the
+# final line is JSON for tools/build_bundle.py --profile.
+
+import gc
+import json
+import time
+
+MODULES = (
+    "adafruit_hid.keycode",
+    "adafruit_hid.keyboard",
+    "adafruit_hid.mouse",
+    "adafruit_mcp230xx.mcp23008",
+    "adafruit_ble",
+    "adafruit_ble.services.standard.hid",
+    "adafruit_display_text.label",
+    "adafruit_displayio_ssd1306",
+    "c7k_keymap",
+    "c7k_bus",
+    "c7k_scanner",
+    "c7k_display",
+    "c7k_oled",
+    "c7k_transport",
+    "c7k_hosts",
+    "c7k_split",
+    "c7k_stats",
+    "c7k_serial",
+    "c7k_trace",
+    "c7k_flat",
+    "c7k_complete",
+    "c7k_steno",
+    "c7k_engine",
+    "c7k_timing",
+    "c7k_hud",
+    "c7k_config",
+)
+
+
+def run():
+    results = []
+    gc.collect()
+    start_free = gc.mem_free()
+    for name in MODULES:
+        gc.collect()
+        free = gc.mem_free()
+        t0 = time.monotonic_ns()
+        try:
+            __import__(name)
+            ok = True
+        except ImportError:
+            ok = False
+        ms = (time.monotonic_ns() - t0) / 1e6
+        gc.collect()
+        used = free - gc.mem_free()
+        results.append({"module": name, "ms": ms, "heap": used, "ok": ok})
+        print("%-36s %8.1f ms %7d B%s" % (name, ms, used, "" if ok else "  (missing)"))
+    gc.collect()
+    print("total heap %d B, free %d B" % (start_free - gc.mem_free(), gc.mem_free()))
+    print("C7KPROF " + json.dumps(results))
+    return results
+
+
+run()
@@ -0,0 +1,65 @@
+# MCP23008 key scanner: seven active-low keys with pull-ups, read as one GPIO
+# register transaction. Bus errors read as "no keys" and the expander is
+# re-configured on a backoff schedule, so the main loop never stalls. With a
+# wireless split the secondary half's seven keys are keys 7..13 (bits 7..13 of
+# the mask), so chords can span both hands.
+
+import time
+
+from adafruit_mcp230xx.mcp23008 import MCP23008
+
+from c7k_bus import Backoff
+
+N_KEYS = 7                  # keys on this board's expander
+KEY_BITS = (1 << N_KEYS) - 1
+KEYS = 2 * N_KEYS           # plus the secondary split half's keys
+
+
+class Scanner:
+    def __init__(self, i2c):
+        self.i2c = i2c
+        self.mcp = None
+        self.backoff = Backoff()
+        self.pressed = [False] * KEYS
+        self.down_at = [0.0] * KEYS     # scan time each key last went down
+        self.mask = 0
+        self.remote = None      # object whose 7-bit .mask becomes keys 7..13 (c7k_split)
+        self.configure()
+
+    def configure(self):
+        """(Re)create the expander and set all keys to inputs with pull-ups."""
+        try:
+            self.mcp = MCP23008(self.i2c)
+            self.mcp.iodir = 0xFF
+            self.mcp.gppu = KEY_BITS
+        except (OSError, ValueError):
+            self.mcp = None
+            self.backoff.fail(time.monotonic())
+            return False
+        self.backoff.ok()
+        return True
+
+    def scan(self):
+        """Refresh pressed[] and the key bitmask; returns the bitmask."""
+        mask = 0
+        if self.mcp is not None or (self.backoff.ready(time.monotonic()) and self.configure()):
+            try:
+                mask = ~self.mcp.gpio & KEY_BITS
+            except OSError:
+                self.mcp = None
+                self.backoff.fail(time.monotonic())
+        if self.remote is not None:
+            mask |= self.remote.mask << N_KEYS
+        if mask != self.mask:
+            pressed = self.pressed
+            down = mask & ~self.mask
+            now = time.monotonic() if down else 0
+            for i in range(KEYS):
+                pressed[i] = bool(mask >> i & 1)
+                if down >> i & 1:
+                    self.down_at[i] = now
+            self.mask = mask
+        return mask
+
+    def summary(self):
+        return "scanner " + self.backoff.summary()
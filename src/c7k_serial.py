@@ -0,0 +1,43 @@
+# Non-blocking line reader for commands typed on the USB serial console.
+
+import sys
+import supervisor
+
+try:
+    import usb_cdc
+except ImportError:
+    usb_cdc = None
+
+MAX_LINE = 2048     # room for a full chord table sent as one config line
+
+_line = bytearray()
+
+
+def poll():
+    """Return a complete command line (str) once one has arrived, else None."""
+    global _line
+    n = supervisor.runtime.serial_bytes_available
+    while n > 0:
+        ch = sys.stdin.read(1)
+        n -= 1
+        if not ch:
+            break
+        if ch in "\r\n":
+            if _line:
+                cmd = _line.decode()
+                _line = bytearray()
+                return cmd.strip()
+        elif len(_line) < MAX_LINE:
+            _line.extend(ch.encode())
+    return None
+
+
+def write_binary(tag, data):
+    """Send data on the usb_cdc data channel if enabled, else hex on the console."""
+    if usb_cdc is not None and usb_cdc.data is not None:
+        usb_cdc.data.write(tag.encode() + len(data).to_bytes(4, "little") + data)
+        return
+    print(tag + ":", end="")
+    for i in range(0, len(data), 64):
+        print("".join("%02x" % b for b in data[i:i + 64]), end="")
+    print()
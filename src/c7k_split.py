@@ -0,0 +1,272 @@
+# Wireless split. The secondary half runs c7k-split-half.py: it scans its own
+# seven keys and streams key-mask deltas over SplitService. The main half (the
+# one holding the host HID link, with SPLIT = True in c7k-full-integration.py)
+# connects to it as a BLE central, reads the deltas and scans the remote keys
+# as keys 7..13 next to its own 0..6, so one chord engine sees both hands and
+# chords can span them (c7k_scanner, c7k_keymap). The main half is the
+# central because adafruit_ble does not say which role a connection has:
+# holding the split Connection itself is how the transport tells it apart from
+# the host and keeps advertising to the host.
+#
+# Delta, secondary -> main (notify, little endian, PACKET_SIZE bytes):
+#   u8 seq | u8 key mask (bit 7: heartbeat) | u16 sender time, ms | u16 round trip, ms (0xFFFF: none)
+# Echo, main -> secondary (write without response):
+#   u8 seq | u16 sender time copied from that delta
+# A delta goes out on every mask change and as a heartbeat every HEARTBEAT
+# seconds; the main half echoes heartbeats and every ECHO_EVERY-th delta, the
+# secondary turns echoes into round trips and reports each one once. Without
+# packets for TIMEOUT seconds the main half releases the remote keys.
+
+import random
+import struct
+import time
+
+from adafruit_ble.advertising.standard import ProvideServicesAdvertisement
+from adafruit_ble.characteristics.stream import StreamIn, StreamOut
+from adafruit_ble.services import Service
+from adafruit_ble.uuid import VendorUUID
+
+from c7k_bus import Backoff
+
+PACKET = "<BBHH"
+PACKET_SIZE = 6
+ECHO = "<BH"
+ECHO_SIZE = 3
+HEARTBEAT_BIT = 0x80
+NO_RTT = 0xFFFF
+HEARTBEAT = 0.5
+TIMEOUT = 1.5
+ECHO_EVERY = 8
+SAMPLES = 32
+SCAN_TIME = 0.025           # one blocking scan window, only after IDLE_SCAN s without
+                            # keys; kept under the 50 ms key-scan period
+ADV_INTERVAL = 0.02         # secondary half: fast enough for one SCAN_TIME window
+IDLE_SCAN = 2.0
+SCAN_FIRST = 1.0
+SCAN_LIMIT = 30.0
+
+
+class SplitService(Service):
+    """Key-mask deltas from the secondary half; echoes back for round trips."""
+
+    uuid = VendorUUID("c7c70001-5c1d-4b8e-9a3f-0d6a2e7b5c11")
+    _server_tx = StreamOut(uuid=VendorUUID("c7c70002-5c1d-4b8e-9a3f-0d6a2e7b5c11"),
+                           timeout=0, buffer_size=PACKET_SIZE * 16)
+    _server_rx = StreamIn(uuid=VendorUUID("c7c70003-5c1d-4b8e-9a3f-0d6a2e7b5c11"),
+                          timeout=0, buffer_size=ECHO_SIZE * 16)
+
+    def __init__(self, service=None):
+        super().__init__(service=service)
+        self.connectable = True
+        # As with UARTService, a client swaps the characteristics it uses
+        if service is None:
+            self.rx, self.tx = self._server_rx, self._server_tx
+        else:
+            self.rx, self.tx = self._server_tx, self._server_rx
+
+
+def ms(now):
+    return int(now * 1000) & 0xFFFF
+
+
+def percentile(ring, n, q):
+    n = min(n, len(ring))
+    if not n:
+        return None
+    return sorted(ring[:n])[min(n - 1, n * q // 100)]
+
+
+class SplitLink:
+    """Main half: connects to the secondary half and merges its key mask."""
+
+    def __init__(self, ble, transport):
+        self.ble = ble
+        self.transport = transport
+        self.connection = None
+        self.rx = self.tx = None
+        self.backoff = Backoff(SCAN_FIRST, SCAN_LIMIT)
+        self.mask = 0
+        self.up = False
+        self.last_rx = -TIMEOUT
+        self.busy_at = 0
+        self.expect = -1
+        self.packets = 0
+        self.lost = 0
+        self.connects = 0
+        self.rtt = bytearray(SAMPLES)           # round trips, ms (capped at 255)
+        self.rtt_n = 0
+        self.delay = bytearray(SAMPLES)         # arrival delay over the lowest seen, ms
+        self.delay_n = 0
+        self.floor = None
+
+    # —— Link ——
+    def attach(self, rx, tx, connection=None):
+        """Use rx/tx (SplitService streams, or a Loopback end) for the link."""
+        self.rx, self.tx = rx, tx
+        self.connection = connection
+        self.transport.peers = (connection,) if connection is not None else ()
+        self.last_rx = -TIMEOUT
+        self.expect = -1
+        self.floor = None
+        self.connects += 1
+
+    def detach(self):
+        self.rx = self.tx = self.connection = None
+        self.transport.peers = ()
+        self.mask = 0
+
+    def scan(self, now):
+        found = None
+        try:
+            for adv in self.ble.start_scan(ProvideServicesAdvertisement, timeout=SCAN_TIME,
+                                           interval=SCAN_TIME, window=SCAN_TIME):
+                if SplitService in adv.services:
+                    found = adv
+                    break
+            self.ble.stop_scan()
+            if found is not None:
+                conn = self.ble.connect(found)
+                service = conn[SplitService]
+                self.attach(service.rx, service.tx, conn)
+                self.backoff.ok()
+                return
+        except (OSError, RuntimeError, ConnectionError):
+            pass
+        self.backoff.fail(now)
+
+    # —— Packets (every scan, before the key scan) ——
+    def poll(self, now, idle=False):
+        """Read deltas; returns True when the link comes up or goes down."""
+        if self.connection is not None and not self.connection.connected:
+            self.detach()
+        if not idle:
+            self.busy_at = now
+        if self.rx is None:
+            if now - self.busy_at >= IDLE_SCAN and self.backoff.ready(now):
+                self.scan(now)
+        else:
+            rx = self.rx
+            while rx.in_waiting >= PACKET_SIZE:
+                data = rx.read(PACKET_SIZE)
+                if data is None or len(data) < PACKET_SIZE:
+                    break
+                self.receive(data, now)
+        up = self.rx is not None and now - self.last_rx < TIMEOUT
+        if not up:
+            self.mask = 0
+        if up != self.up:
+            self.up = up
+            return True
+        return False
+
+    def receive(self, data, now):
+        seq, mask, sent, rtt = struct.unpack(PACKET, data)
+        if self.expect >= 0:
+            self.lost += (seq - self.expect) & 0xFF
+        self.expect = (seq + 1) & 0xFF
+        self.packets += 1
+        self.last_rx = now
+        self.mask = mask & ~HEARTBEAT_BIT
+        if rtt != NO_RTT:
+            self.rtt[self.rtt_n % SAMPLES] = min(rtt, 255)
+            self.rtt_n += 1
+        skew = (ms(now) - sent) & 0xFFFF
+        if self.floor is None or (skew - self.floor) & 0xFFFF > 0x8000:
+            self.floor = skew
+        self.delay[self.delay_n % SAMPLES] = min((skew - self.floor) & 0xFFFF, 255)
+        self.delay_n += 1
+        if mask & HEARTBEAT_BIT or seq % ECHO_EVERY == 0:
+            try:
+                self.tx.write(struct.pack(ECHO, seq, sent))
+            except (OSError, ConnectionError):
+                pass
+
+    def summary(self):
+        total = self.packets + self.lost
+        rtt50 = percentile(self.rtt, self.rtt_n, 50)
+        rtt95 = percentile(self.rtt, self.rtt_n, 95)
+        return "split %s: %d packets, %d lost (%.1f%%), one-way ~%s ms p95 ~%s ms, delay p95 +%s ms, %d connects" % (
+            "up" if self.up else "down", self.packets, self.lost, 100 * self.lost / total if total else 0,
+            rtt50 // 2 if rtt50 is not None else "-", rtt95 // 2 if rtt95 is not None else "-",
+            percentile(self.delay, self.delay_n, 95) if self.delay_n else "-", self.connects)
+
+
+class SplitSender:
+    """Secondary half: streams key-mask deltas and measures round trips."""
+
+    def __init__(self, tx, rx):
+        self.tx, self.rx = tx, rx
+        self.seq = 0
+        self.mask = -1
+        self.last_tx = 0
+        self.rtt = NO_RTT
+        self.sent = 0
+        self.errors = 0
+
+    def update(self, mask, now):
+        rx = self.rx
+        while rx.in_waiting >= ECHO_SIZE:
+            data = rx.read(ECHO_SIZE)
+            if data is None or len(data) < ECHO_SIZE:
+                break
+            _, sent = struct.unpack(ECHO, data)
+            self.rtt = (ms(now) - sent) & 0xFFFF
+        heartbeat = now - self.last_tx >= HEARTBEAT
+        if mask == self.mask and not heartbeat:
+            return False
+        packet = struct.pack(PACKET, self.seq, mask | (HEARTBEAT_BIT if heartbeat else 0), ms(now), self.rtt)
+        try:
+            self.tx.write(packet)
+        except (OSError, ConnectionError):
+            self.errors += 1
+            return False
+        self.rtt = NO_RTT
+        self.seq = (self.seq + 1) & 0xFF
+        self.mask = mask
+        self.last_tx = now
+        self.sent += 1
+        return True
+
+
+class _LoopbackEnd:
+    def __init__(self, link):
+        self.link = link
+        self.peer = None
+        self.queue = []             # (deliver at, bytes)
+        self.buf = b""
+
+    def write(self, data):
+        if self.link.loss and random.random() < self.link.loss:
+            self.link.dropped += 1
+            return
+        self.peer.queue.append((time.monotonic() + self.link.delay, bytes(data)))
+
+    def _deliver(self):
+        now = time.monotonic()
+        while self.queue and self.queue[0][0] <= now:
+            self.buf += self.queue.pop(0)[1]
+
+    @property
+    def in_waiting(self):
+        self._deliver()
+        return len(self.buf)
+
+    def read(self, n):
+        self._deliver()
+        data, self.buf = self.buf[:n], self.buf[n:]
+        return data or None
+
+
+class Loopback:
+    """In-process stand-in for the link between the halves, for host-side
+    tests: bytes written to one end are read from the other after delay
+    seconds, and loss drops that share of writes."""
+
+    def __init__(self, delay=0.0, loss=0.0, seed=0):
+        self.delay = delay
+        self.loss = loss
+        self.dropped = 0
+        random.seed(seed)
+        self.main = _LoopbackEnd(self)
+        self.half = _LoopbackEnd(self)
+        self.main.peer, self.half.peer = self.half, self.main
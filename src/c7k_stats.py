@@ -0,0 +1,138 @@
+# Chord usage and chord-bigram timing statistics with fixed-size counters.
+#
+# Binary image (little endian), also the export format read by tools/read_stats.py:
+#   header : b"C7KS" | u8 version | u8 bins | u16 slots | u32 events
+#   counts : 128 * u32, indexed by chord bitmask (this board's keys; chords
+#            using the secondary split half are only counted in RAM, in .split)
+#   keys   : slots * u16, (previous mask << 7) | mask, 0xFFFF = empty
+#   hist   : slots * bins * u16, inter-chord gap histogram per bigram
+# The gap of bin i is below GAP_EDGES_MS[i]; the last bin is open ended.
+
+import array
+import struct
+import time
+
+MAGIC = b"C7KS"
+VERSION = 1
+SLOTS = 128
+PROBES = 4
+BINS = 8
+GAP_EDGES_MS = (50, 100, 150, 200, 300, 500, 1000)
+GAP_LIMIT = 2.0
+EMPTY = 0xFFFF
+HEADER = "<4sBBHI"
+HEADER_SIZE = 12
+IMAGE_SIZE = HEADER_SIZE + 128 * 4 + SLOTS * 2 + SLOTS * BINS * 2
+
+FLUSH_INTERVAL = 300.0
+FLUSH_MIN_EVENTS = 200
+
+
+class ChordStats:
+    def __init__(self, nvm=None, offset=0):
+        self.nvm = nvm
+        self.offset = offset
+        self.counts = array.array("I", [0] * 128)
+        self.keys = array.array("H", [EMPTY] * SLOTS)
+        self.hist = array.array("H", [0] * (SLOTS * BINS))
+        self.events = 0
+        self.dropped = 0
+        self.split = 0
+        self.prev = -1
+        self.last = 0
+        self.pending = 0
+        self.last_flush = 0
+        self.image = bytearray(IMAGE_SIZE)
+        self.load()
+
+    def record(self, mask, now):
+        """Count one resolved chord; constant time."""
+        if mask > 127:
+            self.split += 1
+            self.prev = -1
+            return
+        self.counts[mask] += 1
+        self.events += 1
+        self.pending += 1
+        prev = self.prev
+        gap = now - self.last
+        self.prev = mask
+        self.last = now
+        if prev < 0 or gap >= GAP_LIMIT:
+            return
+        key = (prev << 7) | mask
+        slot = ((key * 40503) >> 7) & (SLOTS - 1)
+        for _ in range(PROBES):
+            k = self.keys[slot]
+            if k == key:
+                break
+            if k == EMPTY:
+                self.keys[slot] = key
+                break
+            slot = (slot + 1) & (SLOTS - 1)
+        else:
+            self.dropped += 1
+            return
+        ms = gap * 1000
+        b = 0
+        for edge in GAP_EDGES_MS:
+            if ms < edge:
+                break
+            b += 1
+        i = slot * BINS + b
+        if self.hist[i] < 0xFFFF:
+            self.hist[i] += 1
+
+    def reset(self):
+        for i in range(128):
+            self.counts[i] = 0
+        for i in range(SLOTS):
+            self.keys[i] = EMPTY
+        for i in range(SLOTS * BINS):
+            self.hist[i] = 0
+        self.events = 0
+        self.pending = 1
+        self.maybe_flush(time.monotonic(), force=True)
+
+    def pack(self):
+        img = self.image
+        struct.pack_into(HEADER, img, 0, MAGIC, VERSION, BINS, SLOTS, self.events)
+        o = HEADER_SIZE
+        for arr in (self.counts, self.keys, self.hist):
+            raw = bytes(arr)
+            img[o:o + len(raw)] = raw
+            o += len(raw)
+        return img
+
+    def load(self):
+        if self.nvm is None:
+            return
+        head = bytes(self.nvm[self.offset:self.offset + HEADER_SIZE])
+        magic, version, bins, slots, events = struct.unpack(HEADER, head)
+        if magic != MAGIC or version != VERSION or bins != BINS or slots != SLOTS:
+            return
+        o = self.offset + HEADER_SIZE
+        for arr in (self.counts, self.keys, self.hist):
+            n = len(arr) * arr.itemsize
+            raw = bytes(self.nvm[o:o + n])
+            for i in range(len(arr)):
+                arr[i] = int.from_bytes(raw[i * arr.itemsize:(i + 1) * arr.itemsize], "little")
+            o += n
+        self.events = events
+
+    def maybe_flush(self, now, force=False):
+        """Write the image to nvm, at most every FLUSH_INTERVAL and only once
+        FLUSH_MIN_EVENTS chords have accumulated, to spare flash wear. Every nvm
+        slice assignment erases and rewrites its whole flash page, so the image
+        goes out as one slice, and only if it differs from what is stored."""
+        if self.nvm is None or not self.pending:
+            return False
+        if not force and (self.pending < FLUSH_MIN_EVENTS or now - self.last_flush < FLUSH_INTERVAL):
+            return False
+        img = self.pack()
+        base = self.offset
+        if self.nvm[base:base + IMAGE_SIZE] != img:
+            self.nvm[base:base + IMAGE_SIZE] = img
+        self.pending = 0
+        self.last_flush = now
+        return True
@@ -0,0 +1,201 @@
+# Multi-stroke (steno-style) output: sequences of chords translated through a
+# flat dictionary trie built by tools/build_steno.py.
+#
+# Layout (little endian):
+#   header     : b"C7KD" | u8 version | u24 root offset
+#   node       : u8 n_edges | u24 translation offset (0xFFFFFF = none) | n_edges * edge
+#   edge       : u8 stroke (key mask) | u24 child offset
+#   translation: u8 n_keys | u8 backspaces to undo it | n_keys * (u8 modifier | u8 keycode)
+# Edges are sorted by stroke. As with completion, the file is read through
+# c7k_flat (one buffer, or node by node from flash); a stroke visits one node.
+#
+# A stroke is every key pressed until all are released. Strokes match
+# longest-first: while the strokes so far are also the start of a longer
+# entry, output waits for the next stroke or LOOKAHEAD seconds. A stroke that
+# starts no entry types its ordinary chord.
+#
+# Translations are queued and drain() sends DRAIN_KEYS keystrokes per scan:
+# a BLE report takes several ms, and typing a long word in one go would block
+# scanning long enough to miss the next stroke.
+
+from c7k_flat import NONE, FlatFile, load_flat, u24
+
+MAGIC = b"C7KD"
+VERSION = 1
+EDGE_SIZE = 4
+LOOKAHEAD = 0.3
+MAX_STROKES = 8
+HISTORY = 32
+QUEUE = 256                 # queued keystrokes, (modifier, keycode) pairs
+DRAIN_KEYS = 4
+
+
+class Dictionary(FlatFile):
+    MAGIC = MAGIC
+    VERSION = VERSION
+    SCRATCH = 4 + 128 * EDGE_SIZE
+    KIND = "c7k steno dictionary"
+
+    def child(self, node, stroke):
+        """Return (child offset, child has edges, child translation) or None."""
+        cnt = self._read(node, 1)[0]
+        mv = self._read(node, 4 + cnt * EDGE_SIZE)
+        e = 4
+        end = e + cnt * EDGE_SIZE
+        while e < end and mv[e] < stroke:
+            e += EDGE_SIZE
+        if e == end or mv[e] != stroke:
+            return None
+        child = u24(mv, e + 1)
+        mv = self._read(child, 4)
+        return child, mv[0], u24(mv, 1)
+
+    def translation(self, off):
+        """Return (keys as bytes, backspaces) for a translation offset."""
+        mv = self._read(off, 2)
+        n, back = mv[0], mv[1]
+        return bytes(self._read(off + 2, 2 * n)[0:2 * n]), back
+
+
+class StenoTranslator:
+    def __init__(self, dictionary, engine):
+        self.dict = dictionary
+        self.engine = engine
+        self.strokes = bytearray(MAX_STROKES)
+        self.history = bytearray(HISTORY)
+        self.undoable = 0
+        self.queue = bytearray(2 * QUEUE)
+        self.head = 0
+        self.queued = 0
+        self.reset()
+        self.last_stroke = 0
+        self.translations = 0
+        self.fallbacks = 0
+        self.undos = 0
+
+    def reset(self):
+        self.n = 0
+        self.node = self.dict.root
+        self.match = NONE
+        self.match_len = 0
+
+    # —— Strokes ——
+    def stroke(self, mask, now):
+        self.last_stroke = now
+        self.push(mask)
+
+    def push(self, mask):
+        found = self.dict.child(self.node, mask) if self.n < MAX_STROKES else None
+        if found is None:
+            if self.n:
+                self.commit()
+                self.push(mask)
+            else:
+                self.fallback(mask)
+            return
+        self.node, edges, tr = found
+        self.strokes[self.n] = mask
+        self.n += 1
+        if tr != NONE:
+            self.match, self.match_len = tr, self.n
+        if not edges:
+            self.commit()
+
+    def commit(self):
+        """Send the longest match of the pending strokes and re-read the rest."""
+        strokes = bytes(self.strokes[:self.n])
+        tr, used = self.match, self.match_len
+        self.reset()
+        if tr == NONE:
+            self.fallback(strokes[0])
+            used = 1
+        else:
+            self.emit(*self.dict.translation(tr))
+        for s in strokes[used:]:
+            self.push(s)
+
+    def poll(self, now):
+        """Resolve pending strokes once no longer entry can follow in time."""
+        while self.n and now - self.last_stroke >= LOOKAHEAD:
+            self.commit()
+
+    def flush(self):
+        """Resolve every pending stroke and send everything queued."""
+        while self.n:
+            self.commit()
+        self.drain(QUEUE)
+
+    # —— Output ——
+    def remember(self, back):
+        if self.undoable == HISTORY:
+            self.history[:-1] = self.history[1:]
+            self.undoable -= 1
+        self.history[self.undoable] = back
+        self.undoable += 1
+
+    def send(self, mod, code):
+        if self.queued == QUEUE:
+            self.drain(1)
+        i = 2 * ((self.head + self.queued) % QUEUE)
+        self.queue[i] = mod
+        self.queue[i + 1] = code
+        self.queued += 1
+
+    def drain(self, limit=DRAIN_KEYS):
+        """Send up to limit queued keystrokes; call once per scan."""
+        kb = self.engine.keyboard
+        while self.queued and limit:
+            i = 2 * self.head
+            mod, code = self.queue[i], self.queue[i + 1]
+            if mod:
+                kb.press(mod, code)
+            else:
+                kb.press(code)
+            kb.release_all()
+            self.head = (self.head + 1) % QUEUE
+            self.queued -= 1
+            limit -= 1
+
+    def emit(self, keys, back):
+        e = self.engine
+        text = ""
+        for i in range(0, len(keys), 2):
+            self.send(keys[i], keys[i + 1])
+            text += e.keymap.KEYCODE_CHAR.get(keys[i + 1], "")
+        self.remember(back)
+        self.translations += 1
+        e.display.update(text.upper())
+
+    def fallback(self, mask):
+        e = self.engine
+        km = e.keymap
+        key = km.chords.get(tuple(i for i in range(km.KEYS) if mask >> i & 1))
+        self.fallbacks += 1
+        if key is None:
+            return
+        self.send(0, key)
+        self.remember(1 if key in km.KEYCODE_CHAR else 0)
+        e.display.update(km.key_to_char(key))
+
+    def undo(self):
+        """Drop pending strokes, or backspace over the last translation."""
+        self.undos += 1
+        if self.n:
+            self.reset()
+            return
+        back = 1
+        if self.undoable:
+            self.undoable -= 1
+            back = self.history[self.undoable]
+        bs = self.engine.keymap.Keycode.BACKSPACE
+        for _ in range(back):
+            self.send(0, bs)
+
+    def summary(self):
+        return "steno: %d translations, %d fallbacks, %d undos, %d strokes pending, %d keys queued" % (
+            self.translations, self.fallbacks, self.undos, self.n, self.queued)
+
+
+def load_steno(path, engine):
+    d = load_flat(path, Dictionary)
+    return StenoTranslator(d, engine) if d is not None else None
@@ -0,0 +1,236 @@
+# Adaptive chord timing. Watches every press from the first key down to the
+# last key up and learns how long fingers take to land (press skew) and to
+# lift (release skew), per chord as an EWMA and overall as a decaying
+# histogram. min_hold (how long the engine waits after the first key lands)
+# follows the press-skew quantile, plus a margin that grows while premature
+# chords (the engine fired on a subset of what was finally pressed) stay above
+# the target rate, capped so that short taps are still held for one scan past
+# it; release_win follows the release-skew quantile. In this
+# engine combo_window only lets a second chord fire within the same press,
+# which is the misfire being measured, so it is held at its lower bound.
+#
+# nvm image (little endian):
+#   b"C7KA" | u8 version | u8 frozen | u16 chords
+#   f32 misfire rate | f32 margin | f32 min_hold | f32 combo_window | f32 release_win
+#   press hist BINS * u16 | release hist BINS * u16 | hold hist BINS * u16
+
+import array
+import struct
+
+MAGIC = b"C7KA"
+VERSION = 1
+EDGES = (0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3)  # bin i holds values < EDGES[i]
+BINS = len(EDGES) + 1
+HEADER = "<4sBBH5f"
+IMAGE_SIZE = struct.calcsize(HEADER) + 3 * BINS * 2
+SLACK = 0.005               # keeps a window from landing exactly on a scan
+
+TARGET = 0.02               # acceptable share of premature chords
+QUANTILE = 1 - TARGET
+ALPHA = 0.1                 # per-chord EWMA weight
+RATE_ALPHA = 0.05           # misfire rate EWMA weight
+WARMUP = 40                 # chords observed before the windows move
+UPDATE_EVERY = 16
+DECAY_EVERY = 512           # halve the histograms so old habits fade
+MARGIN_STEP = 0.01
+LIMITS = {
+    "min_hold": (0.01, 0.15),
+    "combo_window": (0.01, 0.15),
+    "release_win": (0.01, 0.10),
+}
+SAVE_INTERVAL = 600.0
+
+
+def clamp(name, value):
+    lo, hi = LIMITS[name]
+    return lo if value < lo else hi if value > hi else value
+
+
+def bin_of(value):
+    for i, edge in enumerate(EDGES):
+        if value < edge:
+            return i
+    return BINS - 1
+
+
+def quantile(hist, q):
+    """Lower edge of the bin holding the q-quantile (skews arrive in whole
+    scan periods, so the lower edge is the value actually observed)."""
+    total = sum(hist)
+    if not total:
+        return None
+    acc = 0
+    for i, n in enumerate(hist):
+        acc += n
+        if acc >= q * total:
+            return EDGES[i - 1] if i else 0.0
+    return EDGES[-1]
+
+
+class AdaptiveTiming:
+    def __init__(self, engine, nvm=None, offset=0):
+        self.engine = engine
+        self.nvm = nvm
+        self.offset = offset
+        self.frozen = False
+        self.press_ewma = array.array("f", [0.0] * 128)
+        self.release_ewma = array.array("f", [0.0] * 128)
+        self.press_hist = array.array("H", [0] * BINS)
+        self.release_hist = array.array("H", [0] * BINS)
+        self.hold_hist = array.array("H", [0] * BINS)
+        self.scan_dt = 0.05
+        self.last_scan = 0
+        self.chords = 0
+        self.misfires = 0
+        self.rate = 0.0
+        self.margin = 0.0
+        self.dirty = False
+        self.last_save = 0
+        # current press
+        self.peak = 0
+        self.down_at = 0
+        self.peak_at = 0
+        self.lift_at = 0
+        self.fired = -1
+        self.load()
+
+    # —— Observation (every scan, after check_chords) ——
+    def observe(self, mask, now):
+        if self.last_scan:
+            self.scan_dt += 0.05 * (now - self.last_scan - self.scan_dt)
+        self.last_scan = now
+        peak = self.peak
+        if mask:
+            if not peak:
+                self.down_at = self.peak_at = now
+                self.lift_at = 0
+                self.fired = -1
+                self.peak = mask
+            elif mask & ~peak:
+                self.peak = peak | mask
+                self.peak_at = now
+            elif mask != peak and not self.lift_at:
+                self.lift_at = now
+            if self.fired < 0 and self.engine.pending_combo is not None:
+                self.fired = mask
+        elif peak:
+            self.peak = 0
+            self.finish(peak, now)
+
+    def finish(self, peak, now):
+        if peak > 127:
+            return      # a split-half chord's skew includes the link delay
+        press = self.peak_at - self.down_at
+        release = now - (self.lift_at or now)
+        hold = (self.lift_at or now) - self.down_at
+        self.press_ewma[peak] += ALPHA * (press - self.press_ewma[peak])
+        self.release_ewma[peak] += ALPHA * (release - self.release_ewma[peak])
+        self.press_hist[bin_of(press)] += 1
+        self.release_hist[bin_of(release)] += 1
+        self.hold_hist[bin_of(hold)] += 1
+        premature = 0 <= self.fired != peak
+        self.misfires += premature
+        self.rate += RATE_ALPHA * (premature - self.rate)
+        self.chords += 1
+        if self.chords % DECAY_EVERY == 0:
+            for h in (self.press_hist, self.release_hist, self.hold_hist):
+                for i in range(BINS):
+                    h[i] >>= 1
+        if not self.frozen and self.chords >= WARMUP and self.chords % UPDATE_EVERY == 0:
+            self.adjust()
+
+    # —— Window update ——
+    def adjust(self):
+        if self.rate > TARGET:
+            self.margin = min(self.margin + MARGIN_STEP, LIMITS["min_hold"][1])
+        elif self.rate < TARGET / 2 and self.margin > 0:
+            self.margin = max(self.margin - MARGIN_STEP, 0.0)
+        press = quantile(self.press_hist, QUANTILE)
+        release = quantile(self.release_hist, QUANTILE)
+        hold = quantile(self.hold_hist, TARGET)
+        e = self.engine
+        if press is not None:
+            # The chord resolves on the first scan at least min_hold after the
+            # first key; the last scan with all keys down is a scan before the lift.
+            value = min(press + self.margin, hold - self.scan_dt) - SLACK
+            e.min_hold = clamp("min_hold", value)
+            e.combo_window = LIMITS["combo_window"][0]
+        if release is not None:
+            e.release_win = clamp("release_win", release)
+        self.dirty = True
+
+    # —— Persistence ——
+    def load(self):
+        if self.nvm is None:
+            return
+        o = self.offset
+        raw = bytes(self.nvm[o:o + IMAGE_SIZE])
+        magic, version, frozen, chords, rate, margin, hold, window, release = struct.unpack_from(HEADER, raw)
+        if magic != MAGIC or version != VERSION:
+            return
+        self.frozen = bool(frozen)
+        self.chords = chords
+        self.rate = rate
+        self.margin = margin
+        hist = struct.unpack_from("<%dH" % (3 * BINS), raw, struct.calcsize(HEADER))
+        for i in range(BINS):
+            self.press_hist[i] = hist[i]
+            self.release_hist[i] = hist[BINS + i]
+            self.hold_hist[i] = hist[2 * BINS + i]
+        e = self.engine
+        e.min_hold = clamp("min_hold", hold)
+        e.combo_window = clamp("combo_window", window)
+        e.release_win = clamp("release_win", release)
+
+    def pack(self):
+        e = self.engine
+        img = bytearray(IMAGE_SIZE)
+        struct.pack_into(HEADER, img, 0, MAGIC, VERSION, int(self.frozen), min(self.chords, 0xFFFF),
+                         self.rate, self.margin, e.min_hold, e.combo_window, e.release_win)
+        struct.pack_into("<%dH" % (3 * BINS), img, struct.calcsize(HEADER),
+                         *(list(self.press_hist) + list(self.release_hist) + list(self.hold_hist)))
+        return img
+
+    def maybe_save(self, now, force=False):
+        """Persist learned windows; at most every SAVE_INTERVAL, while idle."""
+        if self.nvm is None or not self.dirty:
+            return False
+        if not force and now - self.last_save < SAVE_INTERVAL:
+            return False
+        img = self.pack()
+        o = self.offset
+        if self.nvm[o:o + IMAGE_SIZE] != img:
+            self.nvm[o:o + IMAGE_SIZE] = img
+        self.dirty = False
+        self.last_save = now
+        return True
+
+    # —— Serial control ——
+    def freeze(self):
+        self.frozen = True
+        self.dirty = True
+
+    def command(self, cmd):
+        arg = cmd[6:].strip()
+        if arg == "freeze":
+            self.freeze()
+        elif arg == "thaw":
+            self.frozen = False
+            self.dirty = True
+        elif arg == "reset":
+            for h in (self.press_hist, self.release_hist, self.hold_hist):
+                for i in range(BINS):
+                    h[i] = 0
+            self.chords = self.misfires = 0
+            self.rate = self.margin = 0.0
+            self.dirty = True
+        return self.summary()
+
+    def summary(self):
+        e = self.engine
+        slow = sorted(range(128), key=lambda m: -self.press_ewma[m])[:3]
+        return ("timing%s: min_hold=%.3f combo_window=%.3f release_win=%.3f margin=%.3f "
+                "misfire=%.1f%% (%d/%d) slowest=%s" % (
+                    " (frozen)" if self.frozen else "", e.min_hold, e.combo_window, e.release_win,
+                    self.margin, self.rate * 100, self.misfires, self.chords,
+                    " ".join("%d:%dms" % (m, self.press_ewma[m] * 1000) for m in slow if self.press_ewma[m])))
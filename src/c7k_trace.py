@@ -0,0 +1,160 @@
+# Opt-in binary trace of what the firmware saw and sent, for offline latency
+# analysis and exact replay (tools/read_trace.py).
+#
+# File (little endian), appended across sessions:
+#   header : b"C7KR" | u8 version | u8 record size | u16 reserved
+#   records: u32 time_us | u8 type | u8 a | u16 b
+#     MARK     a=0            b=0                 (new session, time base restarts)
+#     MASK     a=key mask     b=split-half mask   (keys 7..13; 0 without a split)
+#     CHORD    a=key mask     b=keycode           (resolved by the engine; bit 7
+#                                                  of a: split-half keys too)
+#     SEND     a=kind<<4|link b=keycode/buttons   (HID call, link 0 BLE 1 USB)
+#     SETTINGS a=0            b=length            (v2; followed by b bytes of JSON,
+#                                                  zero-padded to a whole record)
+# time_us is time.monotonic_ns() // 1000 truncated to 32 bits; readers unwrap it.
+# SETTINGS holds the engine's live chord table and timing in the config format
+# (c7k_config.snapshot), written at session start and whenever they change, so
+# a replay runs with the learned and live settings the device had.
+#
+# Records go into a preallocated RAM ring; flush() writes them out in large
+# blocks and is only called from the idle branch of the main loop. The drive
+# is only writable from code when boot.py saw /trace_on.
+
+import json
+import os
+import struct
+import time
+
+MAGIC = b"C7KR"
+VERSION = 2
+HEADER = "<4sBBH"
+HEADER_SIZE = 8
+RECORD = "<IBBH"
+RECORD_SIZE = 8
+
+MARK, MASK, CHORD, SEND, SETTINGS = 0, 1, 2, 3, 4
+PRESS, RELEASE_ALL, TAP, MOVE, CLICK = 1, 2, 3, 4, 5
+
+RING_RECORDS = 512
+FLUSH_RECORDS = 256         # write once this many are pending...
+FLUSH_IDLE = 5.0            # ...or anything pending after this long
+MAX_BYTES = 512 * 1024
+FLAG_PATH = "/trace_on"
+
+
+class Tracer:
+    def __init__(self, f, budget=MAX_BYTES):
+        self.f = f
+        self.budget = budget
+        self.ring = bytearray(RING_RECORDS * RECORD_SIZE)
+        self.view = memoryview(self.ring)
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.written = 0
+        self.last_flush = time.monotonic()
+        self.record(MARK, 0, 0)
+
+    def record(self, kind, a, b):
+        if self.count == RING_RECORDS:
+            self.dropped += 1
+            return
+        struct.pack_into(RECORD, self.ring, self.head * RECORD_SIZE,
+                         (time.monotonic_ns() // 1000) & 0xFFFFFFFF, kind, a, b)
+        self.head = (self.head + 1) % RING_RECORDS
+        self.count += 1
+
+    def mask(self, mask):
+        self.record(MASK, mask & 0x7F, mask >> 7)
+
+    def chord(self, mask, keycode):
+        self.record(CHORD, mask & 0x7F | (0x80 if mask >> 7 else 0), keycode or 0)
+
+    def send(self, kind, link, code):
+        self.record(SEND, kind << 4 | link, code)
+
+    def settings(self, cfg):
+        """Write cfg (a config dict) as JSON after everything recorded so far."""
+        self.flush(time.monotonic(), force=True)
+        if self.f is None:
+            return
+        blob = json.dumps(cfg).encode()
+        pad = -len(blob) % RECORD_SIZE
+        try:
+            self.f.write(struct.pack(RECORD, (time.monotonic_ns() // 1000) & 0xFFFFFFFF,
+                                     SETTINGS, 0, len(blob)))
+            self.f.write(blob)
+            if pad:
+                self.f.write(bytes(pad))
+            self.f.flush()
+        except OSError:
+            self.f = None
+            return
+        self.written += RECORD_SIZE + len(blob) + pad
+        if self.written >= self.budget:
+            self.close()
+
+    def flush(self, now, force=False):
+        """Write pending records if enough are queued; returns bytes written."""
+        if not self.count or self.f is None:
+            return 0
+        if not force and self.count < FLUSH_RECORDS and now - self.last_flush < FLUSH_IDLE:
+            return 0
+        tail = (self.head - self.count) % RING_RECORDS
+        n = self.count
+        first = min(n, RING_RECORDS - tail)
+        try:
+            self.f.write(self.view[tail * RECORD_SIZE:(tail + first) * RECORD_SIZE])
+            if n > first:
+                self.f.write(self.view[:(n - first) * RECORD_SIZE])
+            self.f.flush()
+        except OSError:
+            self.f = None
+            return 0
+        self.count = 0
+        self.last_flush = now
+        self.written += n * RECORD_SIZE
+        if self.written >= self.budget:
+            self.close()
+        return n * RECORD_SIZE
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def summary(self):
+        return "trace %s: %d B written, %d pending, %d dropped" % (
+            "on" if self.f is not None else "stopped", self.written, self.count, self.dropped)
+
+
+def open_trace(path):
+    """Return a Tracer appending to path, or None if tracing is not enabled."""
+    try:
+        os.stat(FLAG_PATH)
+    except OSError:
+        return None
+    try:
+        size = os.stat(path)[6]
+    except OSError:
+        size = 0
+    try:
+        f = open(path, "ab")
+        if size == 0:
+            f.write(struct.pack(HEADER, MAGIC, VERSION, RECORD_SIZE, 0))
+        size = size or HEADER_SIZE
+    except OSError:
+        return None         # drive still read-only to code
+    if size >= MAX_BYTES:
+        f.close()
+        return None
+    return Tracer(f, MAX_BYTES - size)
+
+
+def disable():
+    """Remove the opt-in flag; tracing stops after the next reset."""
+    try:
+        os.remove(FLAG_PATH)
+    except OSError:
+        return False
+    return True
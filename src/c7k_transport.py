@@ -0,0 +1,170 @@
+# HID transport selection: USB HID when the board is enumerated on a USB host,
+# BLE HIDService otherwise. The firmware keeps calling keyboard.press() /
+# mouse.move() etc.; reports go out on whichever transport is active.
+
+import time
+import supervisor
+
+from adafruit_hid.keyboard import Keyboard
+from adafruit_hid.mouse import Mouse
+
+from c7k_trace import PRESS, RELEASE_ALL, TAP, MOVE, CLICK
+
+try:
+    import usb_hid
+except ImportError:
+    usb_hid = None
+
+
+class HIDTransport:
+    def __init__(self, name, devices):
+        self.name = name
+        self.link = 1 if name == "USB" else 0
+        self.keyboard = Keyboard(devices)
+        self.mouse = Mouse(devices)
+        self.reports = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+        self.first_ns = 0       # first report since mark(), for press-to-report latency
+
+    def mark(self):
+        self.first_ns = 0
+
+    def record(self, t0):
+        self.last_ns = time.monotonic_ns()
+        if not self.first_ns:
+            self.first_ns = self.last_ns
+        dt = self.last_ns - t0
+        self.reports += 1
+        self.total_ns += dt
+        if dt > self.max_ns:
+            self.max_ns = dt
+
+    def summary(self):
+        avg = self.total_ns // self.reports // 1000 if self.reports else 0
+        return "%s n=%d avg=%dus max=%dus" % (self.name, self.reports, avg, self.max_ns // 1000)
+
+
+class Transport:
+    ADV_INTERVAL = 0.1
+
+    def __init__(self, ble, hid, advertisement):
+        self.ble = ble
+        self.advertisement = advertisement
+        self.adv_interval = self.ADV_INTERVAL
+        self.trace = None
+        self.keystrokes = 0     # press()/send() calls, for the typing HUD
+        self.peers = ()         # BLE connections that are not the host (split half)
+        self.ble_hid = HIDTransport("BLE", hid.devices)
+        self.usb_hid = None
+        self.active = self.ble_hid
+        self.keyboard = RoutedKeyboard(self)
+        self.mouse = RoutedMouse(self)
+
+    @property
+    def connected(self):
+        return self.active is self.usb_hid or self.host_connected()
+
+    def host_connected(self):
+        if not self.peers:
+            return self.ble.connected
+        for conn in self.ble.connections:
+            if conn not in self.peers:
+                return True
+        return False
+
+    def usb_ready(self):
+        return usb_hid is not None and supervisor.runtime.usb_connected and bool(usb_hid.devices)
+
+    def select(self):
+        """Pick the transport for the next report; returns True if it changed."""
+        if self.usb_ready():
+            if self.usb_hid is None:
+                self.usb_hid = HIDTransport("USB", usb_hid.devices)
+            target = self.usb_hid
+        else:
+            target = self.ble_hid
+        if self.host_connected():
+            if self.ble.advertising:
+                self.ble.stop_advertising()
+        elif not self.ble.advertising:
+            self.ble.start_advertising(self.advertisement, interval=self.adv_interval)
+        if target is self.active:
+            return False
+        self.release_all()
+        self.active = target
+        return True
+
+    def release_all(self):
+        try:
+            self.active.keyboard.release_all()
+        except OSError:
+            pass
+
+    def summary(self):
+        if self.usb_hid is None:
+            return self.ble_hid.summary()
+        return self.ble_hid.summary() + " | " + self.usb_hid.summary()
+
+
+def trace_code(keycodes):
+    # Last keycode in the low byte, a leading modifier in the high byte
+    if not keycodes:
+        return 0
+    code = keycodes[-1]
+    if len(keycodes) > 1:
+        code |= keycodes[0] << 8
+    return code
+
+
+class RoutedKeyboard:
+    def __init__(self, transport):
+        self.transport = transport
+
+    def press(self, *keycodes):
+        t = self.transport.active
+        t0 = time.monotonic_ns()
+        t.keyboard.press(*keycodes)
+        t.record(t0)
+        self.transport.keystrokes += 1
+        if self.transport.trace:
+            self.transport.trace.send(PRESS, t.link, trace_code(keycodes))
+
+    def release_all(self):
+        t = self.transport.active
+        t0 = time.monotonic_ns()
+        t.keyboard.release_all()
+        t.record(t0)
+        if self.transport.trace:
+            self.transport.trace.send(RELEASE_ALL, t.link, 0)
+
+    def send(self, *keycodes):
+        t = self.transport.active
+        t0 = time.monotonic_ns()
+        t.keyboard.send(*keycodes)
+        t.record(t0)
+        self.transport.keystrokes += 1
+        if self.transport.trace:
+            self.transport.trace.send(TAP, t.link, trace_code(keycodes))
+
+
+class RoutedMouse:
+    def __init__(self, transport):
+        self.transport = transport
+
+    def move(self, x=0, y=0, wheel=0):
+        t = self.transport.active
+        t0 = time.monotonic_ns()
+        t.mouse.move(x, y, wheel)
+        t.record(t0)
+        if self.transport.trace:
+            self.transport.trace.send(MOVE, t.link, (x & 0xFF) | (y & 0xFF) << 8)
+
+    def click(self, buttons):
+        t = self.transport.active
+        t0 = time.monotonic_ns()
+        t.mouse.click(buttons)
+        t.record(t0)
+        if self.transport.trace:
+            self.transport.trace.send(CLICK, t.link, buttons)
@@ -0,0 +1,264 @@
+"""Benchmark the scan/resolve/display hot path of the firmware scripts on CPython.
+
+Each script is loaded with tools/c7ksim.py (stand-in modules, virtual clock)
+and measured on:
+
+    resolve      check_chords() for all 128 key states, first scan and held scans
+    display      update_display() rolling-buffer handling; for the split script
+                 the Label and tile renderers and the framebuffer backend are
+                 compared, including the area or I2C bytes each update costs,
+                 for the text row and for the completion hint line
+    key_to_char  keycode -> character mapping
+    sessions     synthetic typing at 40/80/120 WPM through the unmodified main
+                 loop: host time per scan, reports sent and text accuracy
+
+Results are JSON. With --compare, mean/median timings and accuracy are
+checked against a previous run and the exit status is non-zero if any got
+worse by more than --threshold.
+
+    python tools/bench_hotpath.py -o bench.json
+    python tools/bench_hotpath.py --compare bench.json
+"""
+import argparse
+import difflib
+import json
+import os
+import platform
+import sys
+import time
+
+import c7ksim
+import standins
+
+SCRIPTS = {"full": c7ksim.FULL, "stable": c7ksim.STABLE}
+WPM = (40, 80, 120)
+TEXT = ("the quick brown fox jumps over the lazy dog while five boxing wizards "
+        "jump quickly and a sphinx of black quartz judges my vow ")
+# Completion hints as they change while typing (prefix + suggestion, cleared between words)
+HINTS = ("the", "there", "they", "", "quick", "quickly", "", "brown", "browser", "", "jump", "jumps", "")
+
+
+def load(script):
+    sim = c7ksim.Simulator(script, until=0.5)
+    g = sim.run()
+    sim.state.until = float("inf")
+    return sim, g
+
+
+class Target:
+    """Uniform access to the chord state of a split (engine) or flat script."""
+
+    def __init__(self, g):
+        engine = g.get("engine")
+        self.g = g
+        self.state = engine
+        if engine is not None:
+            self.check = engine.check_chords
+            self.pressed = engine.scanner.pressed
+            self.update_display = engine.display.update
+            self.key_to_char = engine.keymap.key_to_char
+        else:
+            self.check = g["check_chords"]
+            self.pressed = g["pressed_keys"]
+            self.update_display = g["update_display"]
+            self.key_to_char = g["key_to_char"]
+
+    def set(self, name, value):
+        if self.state is None:
+            if name in self.g:
+                self.g[name] = value
+        elif hasattr(self.state, name):
+            setattr(self.state, name, value)
+
+    def reset(self):
+        for name in ("pending_combo", "last_hold_time", "last_release_time", "last_combo_time"):
+            self.set(name, None if name == "pending_combo" else 0)
+        self.set("modifier_armed", False)
+        self.set("mouse_armed", False)
+        self.set("held_modifier", None)
+
+    def set_keys(self, mask):
+        for i in range(7):
+            self.pressed[i] = bool(mask >> i & 1)
+        if self.state is not None:
+            self.state.scanner.mask = mask
+        else:
+            self.set("key_mask", mask)
+
+
+def ns_stats(samples):
+    samples = sorted(samples)
+    n = len(samples)
+    return {"mean_ns": sum(samples) // n, "p50_ns": samples[n // 2],
+            "p99_ns": samples[min(n - 1, n * 99 // 100)], "max_ns": samples[-1]}
+
+
+def bench_resolve(sim, t, reps):
+    check = t.check
+    first, held = [], []
+    per_mask = {}
+    for _ in range(reps):
+        for mask in range(128):
+            t.reset()
+            t.set_keys(mask)
+            sim.state.now += 1.0
+            t0 = time.perf_counter_ns()
+            check()
+            dt = time.perf_counter_ns() - t0
+            first.append(dt)
+            per_mask[mask] = per_mask.get(mask, 0) + dt
+            sim.state.now += 0.05
+            t0 = time.perf_counter_ns()
+            check()
+            held.append(time.perf_counter_ns() - t0)
+            del sim.state.reports[:]
+    worst = max(per_mask, key=per_mask.get)
+    t.reset()
+    t.set_keys(0)
+    return {"first_scan": ns_stats(first), "held_scan": ns_stats(held),
+            "worst_mask": worst, "worst_mask_mean_ns": per_mask[worst] // reps}
+
+
+def time_updates(update, reps, texts=None):
+    samples = []
+    for i in range(reps):
+        text = texts[i % len(texts)] if texts else chr(ord("A") + i % 26)
+        t0 = time.perf_counter_ns()
+        update(text)
+        samples.append(time.perf_counter_ns() - t0)
+    return ns_stats(samples)
+
+
+def bench_display(sim, t, reps):
+    mod = t.g.get("c7k_display")
+    if mod is None or not hasattr(mod, "TileText"):
+        return time_updates(t.update_display, reps)
+    out = {}
+    for renderer in ("label", "tiles"):
+        d = mod.Display(t.g["i2c"], renderer=renderer)
+        out[renderer] = time_updates(d.update, reps)
+        out[renderer]["px_per_update"] = d.dirty_px // d.updates
+        out[renderer]["est_bytes_per_update"] = d.dirty_px // d.updates // 8
+        hint = out[renderer]["hint"] = time_updates(d.show_hint, reps, HINTS)
+        hint["px_per_update"] = d.hint_px // d.hint_updates
+        hint["est_bytes_per_update"] = d.hint_px // d.hint_updates // 8
+    with standins.installed(sim.state, os.path.dirname(c7ksim.FULL)):
+        import c7k_oled
+    d = c7k_oled.FrameBufferDisplay(t.g["i2c"])
+
+    def update(ch):
+        d.update(ch)
+        d.flush()
+    out["framebuffer"] = time_updates(update, reps)
+    out["framebuffer"]["bytes_per_update"] = (d.bytes_sent - d.boot_bytes) // d.updates
+    sent = d.bytes_sent
+
+    def show_hint(text):
+        d.show_hint(text)
+        d.flush()
+    hint = out["framebuffer"]["hint"] = time_updates(show_hint, reps, HINTS)
+    hint["bytes_per_update"] = (d.bytes_sent - sent) // reps
+    return out
+
+
+def bench_key_to_char(t, reps):
+    key_to_char = t.key_to_char
+    codes = list(range(256))
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter_ns()
+        for kc in codes:
+            key_to_char(kc)
+        samples.append((time.perf_counter_ns() - t0) // len(codes))
+    return ns_stats(samples)
+
+
+def bench_session(script, combos, expected, wpm):
+    interval = 60.0 / (wpm * 5)
+    events = c7ksim.chord_events(combos, start=0.5, hold=interval * 0.6, gap=interval * 0.4)
+    sim = c7ksim.Simulator(script, events)
+    t0 = time.perf_counter_ns()
+    sim.run()
+    wall = time.perf_counter_ns() - t0
+    typed = sim.typed()
+    return {
+        "wpm": wpm,
+        "scans": sim.state.sleeps,
+        "host_ns_per_scan": wall // max(sim.state.sleeps, 1),
+        "reports": len(sim.reports()),
+        "chars_expected": len(expected),
+        "chars_typed": len(typed),
+        "accuracy": round(difflib.SequenceMatcher(None, expected, typed).ratio(), 4),
+    }
+
+
+def run(names, reps):
+    out = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S")}, "scripts": {}}
+    for name in names:
+        script = SCRIPTS[name]
+        sim, g = load(script)
+        t = Target(g)
+        combos = c7ksim.text_combos(*c7ksim.layout(g), text=TEXT)
+        expected = "".join(c for c in TEXT if c in "abcdefghijklmnopqrstuvwxyz ")
+        out["scripts"][name] = {
+            "resolve": bench_resolve(sim, t, reps),
+            "display": bench_display(sim, t, reps * 100),
+            "key_to_char": bench_key_to_char(t, reps * 10),
+            "sessions": [bench_session(script, combos, expected, wpm) for wpm in WPM],
+        }
+    return out
+
+
+def flatten(d, prefix=""):
+    for k, v in d.items():
+        key = prefix + str(k)
+        if isinstance(v, dict):
+            yield from flatten(v, key + ".")
+        elif isinstance(v, list):
+            for item in v:
+                yield from flatten(item, "%s.%s." % (key, item.get("wpm", "")))
+        elif isinstance(v, (int, float)) and key.endswith(("mean_ns", "p50_ns", "ns_per_scan", "accuracy")):
+            yield key, v
+
+
+def compare(old, new, threshold):
+    old_m = dict(flatten(old["scripts"]))
+    bad = []
+    for key, v in flatten(new["scripts"]):
+        if key not in old_m or not old_m[key]:
+            continue
+        change = (v - old_m[key]) / old_m[key]
+        worse = -change if key.endswith("accuracy") else change
+        if worse > threshold:
+            bad.append((key, old_m[key], v, change))
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scripts", default="full,stable")
+    ap.add_argument("--reps", type=int, default=20)
+    ap.add_argument("-o", "--output")
+    ap.add_argument("--compare", help="previous JSON result to check against")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    result = run(args.scripts.split(","), args.reps)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            bad = compare(json.load(f), result, args.threshold)
+        for key, old, new, change in bad:
+            print("REGRESSION %s: %s -> %s (%+.0f%%)" % (key, old, new, change * 100), file=sys.stderr)
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Benchmark completion lookups against dictionary size.
+
+Builds synthetic Zipf-weighted dictionaries (or uses --words) and times
+Completer.complete() for random prefixes with the same reader the firmware
+uses, either from one buffer or (--flash) node by node from a file. Device
+time is estimated from the p99 with --device-factor (CPython-on-host to
+CircuitPython-on-nRF52840 slowdown) and checked against the scan period.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from build_trie import build, read_counts  # noqa: E402
+from c7k_complete import Completer  # noqa: E402
+
+SCAN_PERIOD = 0.05
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+
+
+def synthetic(n, rng):
+    words = {}
+    while len(words) < n:
+        ln = min(12, max(2, int(rng.gauss(6, 2))))
+        w = "".join(rng.choices(LETTERS, weights=range(26, 0, -1), k=ln))
+        words.setdefault(w, n // (len(words) + 1) + 1)
+    return words
+
+
+def run(counts, samples, rng, flash=False):
+    blob = build(counts)
+    if flash:
+        tmp = tempfile.TemporaryFile()
+        tmp.write(blob)
+        comp = Completer(file=tmp)
+    else:
+        comp = Completer(blob)
+    words = list(counts)
+    prefixes = []
+    for _ in range(samples):
+        w = rng.choice(words)
+        prefixes.append(w[:rng.randint(1, len(w))].encode())
+    times = []
+    for p in prefixes:
+        t0 = time.perf_counter_ns()
+        comp.complete(p)
+        times.append(time.perf_counter_ns() - t0)
+    times.sort()
+    return {
+        "words": len(counts),
+        "bytes": len(blob),
+        "mean_us": sum(times) / len(times) / 1000,
+        "p99_us": times[int(len(times) * 0.99)] / 1000,
+        "max_us": times[-1] / 1000,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,50000,100000")
+    ap.add_argument("--words", help="word list to sample sizes from")
+    ap.add_argument("--samples", type=int, default=5000)
+    ap.add_argument("--device-factor", type=float, default=100.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--flash", action="store_true", help="read nodes from a file, as on-device")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    source = read_counts(args.words) if args.words else None
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        if source is not None:
+            counts = dict(source.most_common(size))
+        else:
+            counts = synthetic(size, rng)
+        r = run(counts, args.samples, rng, args.flash)
+        r["device_p99_ms"] = r["p99_us"] * args.device_factor / 1000
+        r["fits_scan"] = r["device_p99_ms"] < SCAN_PERIOD * 1000
+        results.append(r)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("%8s %10s %9s %9s %9s %12s" % ("words", "bytes", "mean_us", "p99_us", "max_us", "device_p99"))
+    for r in results:
+        print("%8d %10d %9.2f %9.2f %9.2f %12.2f%s" % (
+            r["words"], r["bytes"], r["mean_us"], r["p99_us"], r["max_us"],
+            r["device_p99_ms"], "" if r["fits_scan"] else "  > scan period"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
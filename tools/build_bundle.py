@@ -0,0 +1,129 @@
+"""Build a CIRCUITPY bundle with the firmware modules precompiled by mpy-cross.
+
+    python tools/build_bundle.py --lib ~/adafruit-circuitpython-bundle/lib --words words.c7kt
+
+Writes build/CIRCUITPY/ with code.py (the entry script, which CircuitPython
+requires as source), boot.py, lib/c7k_*.mpy and, with --lib, the Adafruit libraries
+the firmware imports. Module sizes before and after compilation are
+reported. Import time and heap use can only be measured on the board: copy
+c7k_profile.py over as code.py, save the console output, and pass it to
+--profile to merge it into build/report.json. --split-half builds the drive
+for the secondary half of a wireless split instead (c7k-split-half.py as code.py).
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+ENTRY = os.path.join(SRC, "c7k-full-integration.py")
+SPLIT_HALF = os.path.join(SRC, "c7k-split-half.py")
+MODULES = sorted(f[:-3] for f in os.listdir(SRC)
+                 if f.startswith("c7k_") and f.endswith(".py") and f != "c7k_profile.py")
+LIBS = (
+    "adafruit_ble",
+    "adafruit_hid",
+    "adafruit_display_text",
+    "adafruit_displayio_ssd1306.mpy",
+    "adafruit_mcp230xx",
+    "adafruit_bus_device",
+)
+
+
+def compile_module(mpy_cross, src, dst):
+    subprocess.run([mpy_cross, "-O2", "-o", dst, src], check=True)
+
+
+def copy_lib(lib_dir, name, dest):
+    src = os.path.join(lib_dir, name)
+    target = os.path.join(dest, name)
+    if os.path.isdir(src):
+        shutil.copytree(src, target, dirs_exist_ok=True)
+    elif os.path.exists(src):
+        shutil.copy2(src, target)
+    else:
+        raise FileNotFoundError(src)
+
+
+def read_profile(path):
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in reversed(f.read().splitlines()):
+            m = re.match(r"C7KPROF (.*)", line.strip())
+            if m:
+                return json.loads(m.group(1))
+    raise ValueError("no C7KPROF line in %s" % path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-o", "--out", default=os.path.join(ROOT, "build"))
+    ap.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross matching the board's CircuitPython")
+    ap.add_argument("--lib", help="lib/ directory of the Adafruit CircuitPython bundle")
+    ap.add_argument("--words", help="completion dictionary to install as /words.c7kt")
+    ap.add_argument("--steno", help="multi-stroke dictionary to install as /steno.c7kd")
+    ap.add_argument("--split-half", action="store_true", help="build the secondary half of a wireless split")
+    ap.add_argument("--source", action="store_true", help="copy .py instead of compiling")
+    ap.add_argument("--profile", help="console capture from c7k_profile.py")
+    args = ap.parse_args(argv)
+
+    if not args.source and shutil.which(args.mpy_cross) is None:
+        ap.error("%s not found; install the CircuitPython mpy-cross or use --source" % args.mpy_cross)
+
+    drive = os.path.join(args.out, "CIRCUITPY")
+    lib = os.path.join(drive, "lib")
+    shutil.rmtree(drive, ignore_errors=True)
+    os.makedirs(lib)
+
+    shutil.copy2(SPLIT_HALF if args.split_half else ENTRY, os.path.join(drive, "code.py"))
+    shutil.copy2(os.path.join(SRC, "c7k_profile.py"), os.path.join(drive, "c7k_profile.py"))
+    shutil.copy2(os.path.join(SRC, "boot.py"), os.path.join(drive, "boot.py"))
+    if args.words:
+        shutil.copy2(args.words, os.path.join(drive, "words.c7kt"))
+    if args.steno:
+        shutil.copy2(args.steno, os.path.join(drive, "steno.c7kd"))
+
+    report = {"modules": []}
+    for name in MODULES:
+        src = os.path.join(SRC, name + ".py")
+        if args.source:
+            dst = os.path.join(lib, name + ".py")
+            shutil.copy2(src, dst)
+        else:
+            dst = os.path.join(lib, name + ".mpy")
+            compile_module(args.mpy_cross, src, dst)
+        report["modules"].append({"module": name, "py_bytes": os.path.getsize(src),
+                                  "out_bytes": os.path.getsize(dst)})
+
+    if args.lib:
+        for name in LIBS:
+            copy_lib(args.lib, name, lib)
+
+    if args.profile:
+        prof = {p["module"]: p for p in read_profile(args.profile)}
+        report["profile"] = list(prof.values())
+        for m in report["modules"]:
+            if m["module"] in prof:
+                m["import_ms"] = prof[m["module"]]["ms"]
+                m["heap_bytes"] = prof[m["module"]]["heap"]
+
+    with open(os.path.join(args.out, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("%-16s %9s %9s %10s %10s" % ("module", ".py", "out", "import_ms", "heap"))
+    for m in report["modules"]:
+        print("%-16s %9d %9d %10s %10s" % (
+            m["module"], m["py_bytes"], m["out_bytes"],
+            "%.1f" % m["import_ms"] if "import_ms" in m else "-",
+            m.get("heap_bytes", "-")))
+    if "profile" in report:
+        libs = [p for p in report["profile"] if not p["module"].startswith("c7k_")]
+        print("libraries: %.1f ms, %d B heap" % (sum(p["ms"] for p in libs), sum(p["heap"] for p in libs)))
+    print("bundle written to", drive)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Build the multi-stroke dictionary read by src/c7k_steno.py.
+
+Input is JSON mapping strokes to translations. Strokes are "/"-separated,
+and each stroke lists key indices like a live config chord:
+
+    {"0,1/2,3": "the", "1,2,3/0": "people", "0,1,6/0,1,6": "{#ENTER}{#ENTER}",
+     "2,3,5/0": "ing{^}", "0,4/1,4": "{#CONTROL+Z}"}
+
+Translations are typed followed by a space. "{^}" at the end suppresses the
+space, "{#NAME}" or "{#MOD+NAME}" sends a key by its adafruit_hid Keycode
+name (tools/hid_usage.py: HOME, PAGE_UP, F13, ...; no space after a
+translation that ends with one). Everything is compiled to keystrokes here so
+the firmware only replays them. The output is copied to CIRCUITPY as /steno.c7kd.
+"""
+import argparse
+import json
+import re
+import struct
+import sys
+
+from flat_trie import NONE, serialize
+from hid_usage import KEYCODES
+
+MAGIC = b"C7KD"
+VERSION = 1
+EDGE_SIZE = 4
+MAX_STROKES = 8
+MAX_KEYS = 255
+
+SHIFT = KEYCODES["LEFT_SHIFT"]
+CHAR_KEY = {" ": (0, KEYCODES["SPACE"]), "\n": (0, KEYCODES["ENTER"]), "\t": (0, KEYCODES["TAB"])}
+for _i in range(26):
+    CHAR_KEY[chr(97 + _i)] = (0, 4 + _i)
+    CHAR_KEY[chr(65 + _i)] = (SHIFT, 4 + _i)
+for _plain, _shifted, _code in zip("1234567890-=[]\\;'`,./", "!@#$%^&*()_+{}|:\"~<>?",
+                                   list(range(30, 40)) + [45, 46, 47, 48, 49, 51, 52, 53, 54, 55, 56]):
+    CHAR_KEY[_plain] = (0, _code)
+    CHAR_KEY[_shifted] = (SHIFT, _code)
+MODS = {"SHIFT": KEYCODES["LEFT_SHIFT"], "CONTROL": KEYCODES["LEFT_CONTROL"],
+        "CTRL": KEYCODES["LEFT_CONTROL"], "ALT": KEYCODES["LEFT_ALT"], "GUI": KEYCODES["LEFT_GUI"]}
+TOKEN = re.compile(r"\{\^\}|\{#([A-Z0-9_+]+)\}")
+
+
+def parse_stroke(text):
+    mask = 0
+    for k in text.split(","):
+        k = int(k)
+        if not 0 <= k <= 6:
+            raise ValueError("bad key %d in stroke %r" % (k, text))
+        mask |= 1 << k
+    if not mask:
+        raise ValueError("empty stroke")
+    return mask
+
+
+def parse_strokes(text):
+    strokes = tuple(parse_stroke(s) for s in text.split("/"))
+    if len(strokes) > MAX_STROKES:
+        raise ValueError("%r: more than %d strokes" % (text, MAX_STROKES))
+    return strokes
+
+
+def compile_translation(text):
+    """Return (keys, backspaces): (modifier, keycode) pairs and the chars they type."""
+    keys = []
+    back = 0
+    space = False
+    pos = 0
+    parts = []
+    for m in TOKEN.finditer(text):
+        parts.append(("text", text[pos:m.start()]))
+        parts.append(("key", m.group(1)) if m.group(1) else ("attach", None))
+        pos = m.end()
+    parts.append(("text", text[pos:]))
+    for kind, value in parts:
+        if kind == "text":
+            for ch in value:
+                if ch not in CHAR_KEY:
+                    raise ValueError("cannot type %r" % ch)
+                keys.append(CHAR_KEY[ch])
+                back += 1
+            if value:
+                space = True
+        elif kind == "key":
+            *mods, name = value.split("+")
+            code = KEYCODES.get(name)
+            if code is None or any(m not in MODS for m in mods) or len(mods) > 1:
+                raise ValueError("unknown key {#%s}" % value)
+            keys.append((MODS[mods[0]] if mods else 0, code))
+            space = False
+        else:
+            space = False
+    if space and back:
+        keys.append(CHAR_KEY[" "])
+        back += 1
+    if len(keys) > MAX_KEYS:
+        raise ValueError("translation %r too long" % text)
+    return keys, back
+
+
+class _Node:
+    __slots__ = ("children", "translation")
+
+    def __init__(self):
+        self.children = {}
+        self.translation = None
+
+
+def build(entries):
+    """Serialize {strokes tuple: translation text} into the flat trie format."""
+    root = _Node()
+    for strokes, text in entries.items():
+        node = root
+        for s in strokes:
+            node = node.children.setdefault(s, _Node())
+        node.translation = compile_translation(text)
+
+    def translation(node, intern):
+        if not node.translation:
+            return NONE
+        keys, back = node.translation
+        return intern(bytes((len(keys), back)) + b"".join(bytes(k) for k in keys))
+
+    def edge(stroke, child, intern):
+        return struct.pack("<B", stroke) + child.to_bytes(3, "little")
+
+    return serialize(root, MAGIC, VERSION, EDGE_SIZE, translation, edge)
+
+
+def read_entries(path):
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {parse_strokes(k): v for k, v in raw.items()}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("input")
+    ap.add_argument("-o", "--output", default="steno.c7kd")
+    args = ap.parse_args(argv)
+
+    entries = read_entries(args.input)
+    blob = build(entries)
+    with open(args.output, "wb") as f:
+        f.write(blob)
+    prefixes = {k[:i] for k in entries for i in range(1, len(k))}
+    print("%d entries (%d also start longer ones), up to %d strokes -> %s (%d bytes)" % (
+        len(entries), len(prefixes & set(entries)), max(map(len, entries), default=0),
+        args.output, len(blob)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Build the flat completion trie read by src/c7k_complete.py.
+
+Input is either a word list ("word" or "word count" per line) or, with
+--corpus, plain text whose words are counted. The output file is copied to the
+CIRCUITPY drive as /words.c7kt.
+"""
+import argparse
+import collections
+import re
+import struct
+import sys
+
+from flat_trie import NONE, serialize
+
+MAGIC = b"C7KT"
+VERSION = 1
+EDGE_SIZE = 8
+MAX_WORD = 255
+
+
+class _Node:
+    __slots__ = ("children", "count", "best", "best_count")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+        self.best = None
+        self.best_count = 0
+
+
+def _insert(root, word, count):
+    node = root
+    for i in range(len(word)):
+        node = node.children.setdefault(word[i:i + 1], _Node())
+    node.count += count
+
+
+def _compress(node):
+    # Returns {label: child} with single-child, non-terminal chains merged.
+    edges = {}
+    for ch, child in node.children.items():
+        label = ch
+        while child.count == 0 and len(child.children) == 1:
+            (nch, nxt), = child.children.items()
+            label += nch
+            child = nxt
+        child.children = _compress(child)
+        edges[label] = child
+    return edges
+
+
+def _rank(node, prefix):
+    if node.count:
+        node.best, node.best_count = prefix, node.count
+    for label, child in node.children.items():
+        _rank(child, prefix + label)
+        if child.best_count > node.best_count or (
+            child.best_count == node.best_count
+            and node.best is not None and child.best < node.best
+        ):
+            node.best, node.best_count = child.best, child.best_count
+
+
+def build(counts):
+    """Serialize a {word: count} mapping into the flat trie format."""
+    root = _Node()
+    for word, count in counts.items():
+        word = word.lower()
+        if 0 < len(word) <= MAX_WORD and word.isascii():
+            _insert(root, word.encode("ascii"), count)
+    root.children = _compress(root)
+    _rank(root, b"")
+
+    def best(node, intern):
+        return intern(bytes((len(node.best),)) + node.best) if node.best is not None else NONE
+
+    def edge(label, child, intern):
+        return (struct.pack("<BB", label[0], len(label)) + intern(label).to_bytes(3, "little")
+                + child.to_bytes(3, "little"))
+
+    return serialize(root, MAGIC, VERSION, EDGE_SIZE, best, edge)
+
+
+def read_counts(path, corpus=False, limit=None):
+    counts = collections.Counter()
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        if corpus:
+            for line in f:
+                counts.update(w.lower() for w in re.findall(r"[A-Za-z]+", line))
+        else:
+            for line in f:
+                parts = line.split()
+                if not parts or not parts[0].isalpha():
+                    continue
+                counts[parts[0].lower()] += int(parts[1]) if len(parts) > 1 else 1
+    if limit:
+        counts = collections.Counter(dict(counts.most_common(limit)))
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("input")
+    ap.add_argument("-o", "--output", default="words.c7kt")
+    ap.add_argument("--corpus", action="store_true", help="count words in plain text")
+    ap.add_argument("--limit", type=int, help="keep only the N most frequent words")
+    args = ap.parse_args(argv)
+
+    counts = read_counts(args.input, args.corpus, args.limit)
+    blob = build(counts)
+    with open(args.output, "wb") as f:
+        f.write(blob)
+    print("%d words -> %s (%d bytes)" % (len(counts), args.output, len(blob)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Run firmware scripts on the host against the stand-ins in standins.py.
+
+The whole script runs unmodified apart from any script-level settings
+(e.g. SPLIT = True) given to Simulator, including its main loop; the virtual
+time.sleep() applies scripted events (key masks, USB plug/unplug, BLE drops)
+and stops the run when the session is over. Reports are recorded per
+transport, so USB and BLE output can be compared.
+
+    python tools/c7ksim.py src/c7k-full-integration.py --text "hello world" --usb-at 1.5
+    python tools/c7ksim.py --text "hello world" --split --split-loss 0.05
+    python tools/c7ksim.py --text "hel" --file /words.c7kt=build/words.c7kt
+"""
+import argparse
+import os
+import re
+import sys
+import types
+
+import standins
+from hid_usage import SHIFT_BITS, key_text
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+FULL = os.path.join(ROOT, "src", "c7k-full-integration.py")
+STABLE = os.path.join(ROOT, "src", "basics", "stable.py")
+SPLIT_START = 3.0           # the main half scans for its split half only once idle
+
+
+def mask(combo):
+    m = 0
+    for k in combo:
+        m |= 1 << k
+    return m
+
+
+def chord_events(combos, start=0.0, hold=0.12, gap=0.08):
+    """Key-mask events that press and release each combo in turn."""
+    events = []
+    t = start
+    for combo in combos:
+        events.append((t, "keys", mask(combo)))
+        t += hold
+        events.append((t, "keys", 0))
+        t += gap
+    return events
+
+
+def split_half(delay=0.01, loss=0.0, seed=0, every=0.02):
+    """Event that brings up a secondary split half; "remote" events then set
+    its own 7-bit key mask (keys 7..13 on the main half).
+
+    The half is c7k_split.SplitSender (what c7k-split-half.py runs) over a
+    c7k_split.Loopback with the given one-way delay and loss; it is found by
+    the main half's scan like a real peer and polled every `every` seconds.
+    """
+    def start_half(state, _):
+        import c7k_split    # the firmware's own module, on the virtual clock
+        link = c7k_split.Loopback(delay, loss, seed)
+        peer = standins.SplitPeer((c7k_split.SplitService,), types.SimpleNamespace(rx=link.main, tx=link.main))
+        peer.link = link
+        peer.sender = c7k_split.SplitSender(link.half, link.half)
+        state.split_peers.append(peer)
+        poll_half(state, peer)
+
+    def poll_half(state, peer):
+        if peer.connected:
+            peer.sender.update(state.remote_mask, state.now)
+        else:
+            peer.sender.mask = -1
+        state.events.append((state.now + every, poll_half, peer))
+        state.events.sort(key=lambda e: e[0])
+
+    return (0.0, start_half, None)
+
+
+def split_events(combos, start=SPLIT_START, hold=0.12, gap=0.08, delay=0.01, loss=0.0, seed=0, every=0.02):
+    """Events that bring up a secondary split half and press combos across
+    both halves: keys 0..6 on this board, 7..13 on the half."""
+    events = [split_half(delay, loss, seed, every)]
+    for t, _, m in chord_events(combos, start, hold, gap):
+        events.append((t, "keys", m & 0x7F))
+        events.append((t, "remote", m >> 7))
+    return events
+
+
+class Simulator:
+    def __init__(self, script=FULL, events=(), usb=False, ble=True, until=None, settings=None, files=None):
+        self.script = script
+        self.settings = settings or {}
+        self.state = standins.SimState(events, usb=usb, ble=ble, until=until)
+        self.state.files.update(files or {})
+        self.globals = None
+
+    def run(self):
+        with open(self.script, encoding="utf-8") as f:
+            source = f.read()
+        for name, value in self.settings.items():
+            source, n = re.subn(r"^%s = .*$" % name, "%s = %r" % (name, value), source, flags=re.M)
+            if not n:
+                raise ValueError("%s has no setting %s" % (self.script, name))
+        code = compile(source, self.script, "exec")
+        g = {"__name__": "__main__", "__file__": self.script}
+        src = os.path.dirname(self.script)
+        if os.path.basename(src) == "basics":
+            src = os.path.dirname(src)
+        with standins.installed(self.state, src):
+            try:
+                exec(code, g)
+            except standins.SimDone:
+                pass
+        self.globals = g
+        return g
+
+    def reports(self, transport=None):
+        return [r for r in self.state.reports if transport is None or r[1] == transport]
+
+    def typed(self, transport=None):
+        """Decode keyboard reports into the text a host would have received."""
+        out = []
+        prev = {}
+        for _, name, rep in self.reports(transport):
+            if len(rep) != 8:
+                continue
+            keys = set(k for k in rep[2:] if k)
+            for k in sorted(keys - prev.get(name, set())):
+                out.append(key_text(k, rep[0] & SHIFT_BITS))
+            prev[name] = keys
+        return "".join(out)
+
+
+def layout(g):
+    """(chords, Keycode) of a loaded script: module tables or script globals."""
+    engine = g.get("engine")
+    if engine is not None:
+        return engine.keymap.chords, engine.keymap.Keycode
+    return g["chords"], g["Keycode"]
+
+
+def text_combos(chord_table, keycode, text):
+    """Map text onto the firmware's own chord table (first chord wins)."""
+    names = {getattr(keycode, n): n for n in dir(keycode) if not n.startswith("_")}
+    by_char = {}
+    for combo, kc in chord_table.items():
+        name = names.get(kc, "")
+        ch = {"SPACE": " ", "SPACEBAR": " ", "ENTER": "\n", "RETURN": "\n",
+               "PERIOD": ".", "COMMA": ","}.get(name)
+        if ch is None and len(name) == 1:
+            ch = name.lower()
+        if ch is not None:
+            by_char.setdefault(ch, combo)
+    return [by_char[c] for c in text.lower() if c in by_char]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("script", nargs="?", default=FULL)
+    ap.add_argument("--text", default="hello world")
+    ap.add_argument("--usb", action="store_true", help="start with USB enumerated")
+    ap.add_argument("--usb-at", type=float, help="plug USB in at this time (s)")
+    ap.add_argument("--unplug-at", type=float, help="unplug USB at this time (s)")
+    ap.add_argument("--split", action="store_true",
+                    help="add a secondary split half and type with its chords where it has them")
+    ap.add_argument("--split-loss", type=float, default=0.0, help="share of split packets dropped")
+    ap.add_argument("--file", action="append", default=[], metavar="/NAME=PATH",
+                    help="put a host file on the simulated drive, e.g. /words.c7kt=words.c7kt")
+    args = ap.parse_args(argv)
+    files = {}
+    for spec in args.file:
+        name, _, path = spec.partition("=")
+        if not standins.on_drive(name) or not path:
+            ap.error("--file takes /NAME=PATH")
+        with open(path, "rb") as f:
+            files[name] = f.read()
+
+    probe = Simulator(args.script, until=0.5, files=files).run()
+    chords, keycode = layout(probe)
+    if args.split:
+        # The secondary half's chords first, so text_combos picks them
+        chords = dict([kv for kv in chords.items() if kv[0][0] >= 7] + list(chords.items()))
+    combos = text_combos(chords, keycode, text=args.text)
+    if args.split:
+        events = split_events(combos, loss=args.split_loss)
+    else:
+        events = chord_events(combos, start=0.5)
+    if args.usb_at is not None:
+        events.append((args.usb_at, "usb", True))
+    if args.unplug_at is not None:
+        events.append((args.unplug_at, "usb", False))
+    sim = Simulator(args.script, events, usb=args.usb, settings={"SPLIT": True} if args.split else None,
+                    files=files)
+    g = sim.run()
+    for name in ("BLE", "USB"):
+        print("%s: %r (%d reports)" % (name, sim.typed(name), len(sim.reports(name))))
+    if "transport" in g:
+        print(g["transport"].summary())
+    if args.split:
+        print(g["split"].summary())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
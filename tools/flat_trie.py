@@ -0,0 +1,54 @@
+"""Serializer for the flat, offset-linked tries read through src/c7k_flat.py.
+
+build_trie.py (completion) and build_steno.py (multi-stroke dictionary) share
+the layout: an 8-byte header, then every node in depth-first order as
+u8 n_edges | u24 value offset | edges sorted by key, then a pool of
+deduplicated byte strings the nodes and edges point into.
+"""
+
+NONE = 0xFFFFFF
+HEADER_SIZE = 8
+NODE_SIZE = 4
+
+
+def serialize(root, magic, version, edge_size, node_value, edge_bytes):
+    """Return the file for a tree of nodes with a .children {key: node} dict.
+
+    node_value(node, intern) gives a node's u24 value offset (or NONE);
+    edge_bytes(key, child_offset, intern) gives one edge_size-byte edge.
+    intern(blob) stores a byte string in the pool once and returns its offset.
+    """
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children[k] for k in sorted(node.children, reverse=True))
+
+    offset = {}
+    pos = HEADER_SIZE
+    for node in nodes:
+        offset[id(node)] = pos
+        pos += NODE_SIZE + len(node.children) * edge_size
+
+    pool = bytearray()
+    strings = {}
+
+    def intern(blob):
+        if blob not in strings:
+            strings[blob] = pos + len(pool)
+            pool.extend(blob)
+        return strings[blob]
+
+    out = bytearray(magic) + bytes((version,)) + offset[id(root)].to_bytes(3, "little")
+    for node in nodes:
+        out.append(len(node.children))
+        out += node_value(node, intern).to_bytes(3, "little")
+        for key in sorted(node.children):
+            edge = edge_bytes(key, offset[id(node.children[key])], intern)
+            assert len(edge) == edge_size
+            out += edge
+    out += pool
+    if len(out) > NONE:
+        raise ValueError("dictionary too large for 24-bit offsets")
+    return bytes(out)
@@ -0,0 +1,66 @@
+"""HID keyboard usage table (usage page 0x07) with adafruit_hid Keycode names.
+
+Shared by the host tools so that key names, and the text a stream of key
+presses reads as, are the same everywhere: the simulator's stand-in Keycode,
+trace decoding and replay comparison, and the dictionary builders.
+"""
+
+# Canonical names first; aliases (as in adafruit_hid.keycode.Keycode) after.
+USAGES = [(chr(ord("A") + i), 0x04 + i) for i in range(26)]
+USAGES += list(zip(("ONE", "TWO", "THREE", "FOUR", "FIVE", "SIX", "SEVEN", "EIGHT", "NINE", "ZERO"),
+                   range(0x1E, 0x28)))
+USAGES += [
+    ("ENTER", 0x28), ("ESCAPE", 0x29), ("BACKSPACE", 0x2A), ("TAB", 0x2B), ("SPACEBAR", 0x2C),
+    ("MINUS", 0x2D), ("EQUALS", 0x2E), ("LEFT_BRACKET", 0x2F), ("RIGHT_BRACKET", 0x30),
+    ("BACKSLASH", 0x31), ("POUND", 0x32), ("SEMICOLON", 0x33), ("QUOTE", 0x34),
+    ("GRAVE_ACCENT", 0x35), ("COMMA", 0x36), ("PERIOD", 0x37), ("FORWARD_SLASH", 0x38),
+    ("CAPS_LOCK", 0x39),
+]
+USAGES += [("F%d" % (i + 1), 0x3A + i) for i in range(12)]
+USAGES += [
+    ("PRINT_SCREEN", 0x46), ("SCROLL_LOCK", 0x47), ("PAUSE", 0x48), ("INSERT", 0x49),
+    ("HOME", 0x4A), ("PAGE_UP", 0x4B), ("DELETE", 0x4C), ("END", 0x4D), ("PAGE_DOWN", 0x4E),
+    ("RIGHT_ARROW", 0x4F), ("LEFT_ARROW", 0x50), ("DOWN_ARROW", 0x51), ("UP_ARROW", 0x52),
+    ("KEYPAD_NUMLOCK", 0x53), ("KEYPAD_FORWARD_SLASH", 0x54), ("KEYPAD_ASTERISK", 0x55),
+    ("KEYPAD_MINUS", 0x56), ("KEYPAD_PLUS", 0x57), ("KEYPAD_ENTER", 0x58),
+]
+USAGES += list(zip(("KEYPAD_ONE", "KEYPAD_TWO", "KEYPAD_THREE", "KEYPAD_FOUR", "KEYPAD_FIVE",
+                    "KEYPAD_SIX", "KEYPAD_SEVEN", "KEYPAD_EIGHT", "KEYPAD_NINE", "KEYPAD_ZERO"),
+                   range(0x59, 0x63)))
+USAGES += [
+    ("KEYPAD_PERIOD", 0x63), ("KEYPAD_BACKSLASH", 0x64), ("APPLICATION", 0x65), ("POWER", 0x66),
+    ("KEYPAD_EQUALS", 0x67),
+]
+USAGES += [("F%d" % (i + 13), 0x68 + i) for i in range(12)]
+USAGES += [
+    ("LEFT_CONTROL", 0xE0), ("LEFT_SHIFT", 0xE1), ("LEFT_ALT", 0xE2), ("LEFT_GUI", 0xE3),
+    ("RIGHT_CONTROL", 0xE4), ("RIGHT_SHIFT", 0xE5), ("RIGHT_ALT", 0xE6), ("RIGHT_GUI", 0xE7),
+    # aliases
+    ("RETURN", 0x28), ("SPACE", 0x2C), ("CONTROL", 0xE0), ("SHIFT", 0xE1), ("ALT", 0xE2),
+    ("OPTION", 0xE2), ("GUI", 0xE3), ("WINDOWS", 0xE3), ("COMMAND", 0xE3),
+]
+
+KEYCODES = dict(USAGES)                 # name -> usage
+NAME = {}                               # usage -> canonical name
+for _name, _code in USAGES:
+    NAME.setdefault(_code, _name)
+MODIFIERS = range(0xE0, 0xE8)
+SHIFT_BITS = 0x22                       # left/right shift in a report's modifier byte
+
+USAGE_CHAR = {0x04 + i: chr(ord("a") + i) for i in range(26)}
+USAGE_CHAR.update({0x1E + i: c for i, c in enumerate("1234567890")})
+USAGE_CHAR.update({0x28: "\n", 0x2B: "\t", 0x2C: " ", 0x2D: "-", 0x2E: "=", 0x2F: "[", 0x30: "]",
+                   0x31: "\\", 0x33: ";", 0x34: "'", 0x35: "`", 0x36: ",", 0x37: ".", 0x38: "/"})
+SHIFTED = dict(zip("1234567890-=[]\\;'`,./", "!@#$%^&*()_+{}|:\"~<>?"))
+SPECIAL = {0x2A: "\b", 0x4C: "<del>"}
+
+
+def key_text(code, shift=False):
+    """How one key press reads as typed text: its character, "\\b" for
+    backspace, "<del>" for delete, else "<NAME>"."""
+    ch = USAGE_CHAR.get(code)
+    if ch is None:
+        return SPECIAL.get(code) or "<%s>" % NAME.get(code, code)
+    if shift:
+        return SHIFTED.get(ch, ch.upper())
+    return ch
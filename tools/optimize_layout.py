@@ -0,0 +1,317 @@
+"""Search for a better letter-to-chord assignment from a text corpus.
+
+Unigram and bigram frequencies are counted with NumPy. A layout is scored by
+the expected cost per character:
+
+    size   : keys pressed per character
+    effort : finger-weighted keys per character (pinky and the 5/6 keys cost more)
+    trans  : cost of moving from one chord to the next, per bigram. A key held
+             in both chords must lift and re-press (same-finger cost), and every
+             key that changes state adds a smaller cost.
+
+Only the letters move. Space, digits, punctuation, navigation chords and
+layer triggers stay where the firmware has them. Letters may take any chord
+that a letter holds now or that is unused. The search is a simulated-annealing
+local search run in parallel from several seeds with multiprocessing.
+
+    python tools/optimize_layout.py corpus.txt -o chords_optimized.py
+
+With --config the result is also written as a live config for the running
+firmware (save it as /c7k_config.json or send it as a "config ..." line).
+Chords the firmware reserves (c7k_config.reserved_chords: triggers, host,
+HUD and steno chords), the hold-tap keys and the strict subsets of the
+trigger chords (which every trigger press passes through) are never given to
+letters, and every result is checked with c7k_config.compile_config before it
+is written.
+"""
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import sys
+from itertools import combinations
+
+import numpy as np
+
+import standins
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+FIRMWARE = [
+    os.path.join(ROOT, "src", "c7k_keymap.py"),
+    os.path.join(ROOT, "src", "basics", "stable.py"),
+]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+SYMBOLS = LETTERS + " "
+N_KEYS = 7
+FINGER_WEIGHT = np.array([1.4, 1.2, 1.0, 1.0, 1.1, 1.3, 1.3])
+SAME_FINGER = 1.0
+KEY_CHANGE = 0.25
+
+
+# —— Firmware chord tables ——
+def read_layout(path):
+    """Return (chords, reserved) from a firmware script: {combo: keycode name}, {combo}."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    chords, reserved = None, set()
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or not isinstance(node.targets[0], ast.Name):
+            continue
+        name = node.targets[0].id
+        if name == "chords" and isinstance(node.value, ast.Dict):
+            chords = {}
+            for k, v in zip(node.value.keys, node.value.values):
+                chords[ast.literal_eval(k)] = v.attr
+        elif name.endswith(("_trigger", "_chord")) and isinstance(node.value, ast.Tuple):
+            try:
+                reserved.add(ast.literal_eval(node.value))
+            except ValueError:
+                pass
+    if chords is None:
+        raise ValueError("%s has no chords table" % path)
+    return chords, reserved
+
+
+def load_firmware_config():
+    """(c7k_config, c7k_keymap) imported against the stand-ins."""
+    with standins.installed(standins.SimState(), SRC):
+        import c7k_config
+        import c7k_keymap
+    return c7k_config, c7k_keymap
+
+
+def trigger_subsets(config, keymap):
+    """Strict subsets of the layer/completion triggers: a letter there would be
+    typed on the way into every trigger press."""
+    out = set()
+    for name in config.TRIGGERS:
+        trigger = getattr(keymap, name)
+        for n in range(1, len(trigger)):
+            out.update(combinations(trigger, n))
+    return out
+
+
+def firmware_reserved(config, keymap):
+    """Chords the live config rejects, plus the hold-tap keys (a letter there
+    would only be sent on release) and the strict subsets of the triggers."""
+    return (set(config.reserved_chords(keymap)) | {(k,) for k in keymap.hold_tap}
+            | trigger_subsets(config, keymap))
+
+
+def check_config(config, keymap, chords):
+    """Raise ValueError unless the firmware would accept chords as a config."""
+    config.compile_config(config_dict(chords), keymap)
+
+
+def write_layout(chords, path):
+    items = sorted(chords.items(), key=lambda kv: (len(kv[0]), kv[0]))
+    cells = ["%s: Keycode.%s," % (("(%s,)" % c[0]) if len(c) == 1 else "(%s)" % ",".join(map(str, c)), kc)
+             for c, kc in items]
+    width = max(len(c) for c in cells) + 1
+    lines = ["chords = {"]
+    for i in range(0, len(cells), 3):
+        lines.append("    " + "".join(c.ljust(width) for c in cells[i:i + 3]).rstrip())
+    lines[-1] = lines[-1].rstrip(",")
+    lines.append("}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def config_dict(chords):
+    return {"replace": True, "chords": {",".join(map(str, c)): kc for c, kc in sorted(chords.items())}}
+
+
+def write_config(chords, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config_dict(chords), f, separators=(",", ":"))
+        f.write("\n")
+
+
+# —— Corpus statistics ——
+def ngrams(text):
+    """Return (unigram, bigram) frequency arrays over SYMBOLS, normalised per character."""
+    lut = np.full(256, -1, dtype=np.int64)
+    for i, c in enumerate(SYMBOLS):
+        lut[ord(c)] = i
+        lut[ord(c.upper())] = i
+    raw = np.frombuffer(text.encode("latin-1", "replace"), dtype=np.uint8)
+    idx = lut[raw]
+    n = len(SYMBOLS)
+    uni = np.bincount(idx[idx >= 0], minlength=n).astype(np.float64)
+    a, b = idx[:-1], idx[1:]
+    ok = (a >= 0) & (b >= 0)
+    bi = np.bincount(a[ok] * n + b[ok], minlength=n * n).astype(np.float64).reshape(n, n)
+    total = max(uni.sum(), 1.0)
+    return uni / total, bi / total
+
+
+# —— Cost model ——
+class Problem:
+    def __init__(self, uni, bi, pool, fixed):
+        self.uni = uni
+        self.bi = bi
+        self.pool = pool                      # candidate chords, tuples
+        self.fixed = fixed                    # {symbol index: chord} kept in place
+        keys = np.zeros((len(pool), N_KEYS))
+        for i, c in enumerate(pool):
+            keys[i, list(c)] = 1
+        self.size = keys.sum(1)
+        self.effort = keys @ FINGER_WEIGHT
+        both = keys @ keys.T
+        changed = self.size[:, None] + self.size[None, :] - 2 * both
+        self.trans = SAME_FINGER * both + KEY_CHANGE * changed
+
+    def terms(self, assign):
+        """Per-character size, effort and transition cost of an assignment (pool indices)."""
+        size = float(self.uni @ self.size[assign])
+        effort = float(self.uni @ self.effort[assign])
+        trans = float((self.bi * self.trans[np.ix_(assign, assign)]).sum())
+        return size, effort, trans
+
+    def cost(self, assign):
+        _, effort, trans = self.terms(assign)
+        return effort + trans
+
+    def layout_assign(self, chords):
+        """Pool indices for a {symbol: chord} layout."""
+        where = {c: i for i, c in enumerate(self.pool)}
+        return np.array([where[chords[s]] for s in SYMBOLS])
+
+
+def anneal(problem, start, seed, iters, t0=0.05):
+    rng = np.random.default_rng(seed)
+    free_syms = np.array([i for i in range(len(SYMBOLS)) if i not in problem.fixed])
+    assign = start.copy()
+    if seed:
+        assign[free_syms] = rng.permutation(assign[free_syms])
+    used = set(assign.tolist())
+    spare = [i for i in range(len(problem.pool)) if i not in used]
+    cur = problem.cost(assign)
+    best, best_cost = assign.copy(), cur
+    for step in range(iters):
+        t = t0 * (1 - step / iters) + 1e-6
+        a = free_syms[rng.integers(len(free_syms))]
+        if spare and rng.random() < 0.3:
+            j = int(rng.integers(len(spare)))
+            old = assign[a]
+            assign[a] = spare[j]
+            new = problem.cost(assign)
+            if new <= cur or rng.random() < np.exp((cur - new) / t):
+                spare[j] = old
+                cur = new
+            else:
+                assign[a] = old
+        else:
+            b = free_syms[rng.integers(len(free_syms))]
+            if a == b:
+                continue
+            assign[a], assign[b] = assign[b], assign[a]
+            new = problem.cost(assign)
+            if new <= cur or rng.random() < np.exp((cur - new) / t):
+                cur = new
+            else:
+                assign[a], assign[b] = assign[b], assign[a]
+        if cur < best_cost:
+            best, best_cost = assign.copy(), cur
+    return best_cost, best
+
+
+def _worker(args):
+    problem, start, seed, iters = args
+    return anneal(problem, start, seed, iters)
+
+
+def build_problem(chords, reserved, uni, bi):
+    names = {s.upper(): s for s in LETTERS}
+    names["SPACE"] = " "
+    current = {}
+    for combo, kc in chords.items():
+        s = names.get(kc)
+        if s is not None and s not in current:
+            current[s] = combo
+    missing = [s for s in SYMBOLS if s not in current]
+    if missing:
+        raise ValueError("layout has no chord for %r" % "".join(missing))
+    taken = set(chords) | reserved
+    all_chords = [c for n in range(1, N_KEYS + 1) for c in combinations(range(N_KEYS), n)]
+    free = [c for c in all_chords if c not in taken]
+    letter_chords = [current[s] for s in LETTERS]
+    pool = letter_chords + [current[" "]] + free
+    fixed = {SYMBOLS.index(" "): current[" "]}
+    return Problem(uni, bi, pool, fixed), current
+
+
+def report(problem, assign):
+    size, effort, trans = problem.terms(assign)
+    return {"keys_per_char": round(size, 4), "effort_per_char": round(effort, 4),
+            "transition_per_char": round(trans, 4), "cost": round(effort + trans, 4)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("corpus", nargs="+")
+    ap.add_argument("-o", "--output", default="chords_optimized.py")
+    ap.add_argument("--firmware", action="append", help="layout(s) to compare; the first is the base")
+    ap.add_argument("--seeds", type=int, default=8)
+    ap.add_argument("--iters", type=int, default=20000)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count())
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--config", help="also write the layout as a live config JSON")
+    args = ap.parse_args(argv)
+
+    text = ""
+    for path in args.corpus:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            text += f.read() + "\n"
+    uni, bi = ngrams(text)
+    firmware = args.firmware or FIRMWARE
+    base_chords, reserved = read_layout(firmware[0])
+    config, keymap = load_firmware_config()
+    reserved |= firmware_reserved(config, keymap)
+    problem, current = build_problem(base_chords, reserved, uni, bi)
+
+    results = {}
+    for path in firmware:
+        chords, _ = read_layout(path)
+        _, layout = build_problem(chords, reserved, uni, bi)
+        try:
+            results[os.path.relpath(path, ROOT)] = report(problem, problem.layout_assign(layout))
+        except KeyError:
+            results[os.path.relpath(path, ROOT)] = "uses chords outside the base pool"
+
+    start = problem.layout_assign(current)
+    jobs = [(problem, start, seed, args.iters) for seed in range(args.seeds)]
+    with multiprocessing.Pool(max(1, min(args.jobs, args.seeds))) as pool:
+        found = pool.map(_worker, jobs)
+    found.append((problem.cost(start), start))
+    best_cost, best = min(found, key=lambda r: r[0])
+    results["optimized"] = report(problem, best)
+
+    optimized = {c: kc for c, kc in base_chords.items() if kc not in {s.upper() for s in LETTERS}}
+    for i, s in enumerate(LETTERS):
+        optimized[problem.pool[best[i]]] = s.upper()
+    try:
+        check_config(config, keymap, optimized)
+    except ValueError as e:
+        ap.error("optimized layout rejected by the firmware: %s" % e)
+    write_layout(optimized, args.output)
+    results["output"] = args.output
+    if args.config:
+        write_config(optimized, args.config)
+        results["config"] = args.config
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("%-34s %9s %9s %9s %9s" % ("layout", "keys/ch", "effort", "trans", "cost"))
+    for name, r in results.items():
+        if isinstance(r, dict):
+            print("%-34s %9.3f %9.3f %9.3f %9.3f" % (
+                name, r["keys_per_char"], r["effort_per_char"], r["transition_per_char"], r["cost"]))
+    print("wrote", args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Decode a chord statistics export (the "stats" serial command).
+
+Accepts a raw dump from the usb_cdc data channel (b"C7KS" + u32 length +
+image), a console capture containing a "C7KS:<hex>" line, or --port to ask
+the device directly (needs pyserial). Chords are named from the firmware's
+chord table.
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import c7k_stats  # noqa: E402
+from optimize_layout import FIRMWARE, read_layout  # noqa: E402
+
+
+def extract(blob):
+    """Return the stats image from a raw or console capture."""
+    m = re.search(rb"C7KS:([0-9a-fA-F]+)", blob)
+    if m:
+        return bytes.fromhex(m.group(1).decode())
+    i = blob.find(b"C7KS")
+    if i < 0:
+        raise ValueError("no C7KS export found")
+    if blob[i + 8:i + 12] == b"C7KS":
+        n = int.from_bytes(blob[i + 4:i + 8], "little")
+        return blob[i + 8:i + 8 + n]
+    return blob[i:]
+
+
+def decode(img):
+    magic, version, bins, slots, events = struct.unpack_from(c7k_stats.HEADER, img)
+    if magic != c7k_stats.MAGIC or version != c7k_stats.VERSION:
+        raise ValueError("unsupported stats image")
+    o = c7k_stats.HEADER_SIZE
+    counts = struct.unpack_from("<128I", img, o)
+    o += 128 * 4
+    keys = struct.unpack_from("<%dH" % slots, img, o)
+    o += slots * 2
+    hist = struct.unpack_from("<%dH" % (slots * bins), img, o)
+    bigrams = []
+    for s, key in enumerate(keys):
+        if key == c7k_stats.EMPTY:
+            continue
+        h = list(hist[s * bins:(s + 1) * bins])
+        bigrams.append({"prev": key >> 7, "mask": key & 0x7F, "count": sum(h), "hist": h})
+    return {"events": events, "counts": list(counts), "bigrams": bigrams}
+
+
+def combo(mask):
+    return tuple(i for i in range(7) if mask >> i & 1)
+
+
+def median_bin(h):
+    half = sum(h) / 2
+    acc = 0
+    for i, n in enumerate(h):
+        acc += n
+        if acc >= half:
+            return i
+    return len(h) - 1
+
+
+def bin_label(i):
+    edges = c7k_stats.GAP_EDGES_MS
+    if i == len(edges):
+        return ">=%dms" % edges[-1]
+    return "<%dms" % edges[i]
+
+
+def fetch(port):
+    import serial
+    with serial.Serial(port, 115200, timeout=2) as s:
+        s.write(b"\r\nstats\r\n")
+        data = b""
+        while True:
+            chunk = s.read(4096)
+            if not chunk:
+                return data
+            data += chunk
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("dump", nargs="?")
+    ap.add_argument("--port", help="serial port of the device console")
+    ap.add_argument("--firmware", default=FIRMWARE[0])
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.port:
+        blob = fetch(args.port)
+    else:
+        with open(args.dump, "rb") as f:
+            blob = f.read()
+    data = decode(extract(blob))
+    if args.json:
+        print(json.dumps(data))
+        return
+
+    chords, _ = read_layout(args.firmware)
+    name = lambda m: "%s %s" % (combo(m), chords.get(combo(m), "?"))
+    print("%d chords recorded" % data["events"])
+    print("\nmost used chords:")
+    ranked = sorted(range(128), key=lambda m: -data["counts"][m])
+    for m in ranked[:args.top]:
+        if data["counts"][m]:
+            print("  %8d  %s" % (data["counts"][m], name(m)))
+    print("\nslowest transitions (median gap):")
+    slow = sorted(data["bigrams"], key=lambda b: (-median_bin(b["hist"]), -b["count"]))
+    for b in slow[:args.top]:
+        print("  %8s  %6d  %s -> %s" % (bin_label(median_bin(b["hist"])), b["count"],
+                                        name(b["prev"]), name(b["mask"])))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Decode a keystroke trace (/trace.c7kr) into timelines, latencies and replays.
+
+Each session in the file (one per boot with tracing on) is printed as a
+timeline of key-mask changes, resolved chords and HID calls. The summary
+gives scan-to-chord and chord-to-report latencies. --replay feeds the
+recorded key masks back through the firmware on the host (tools/c7ksim.py),
+with the chord table and timing the device had (SETTINGS records, sent to
+the simulated firmware as "config" lines), and compares what it types with
+what the device sent. Both sides are rendered by hid_usage.key_text.
+
+    python tools/read_trace.py trace.c7kr
+    python tools/read_trace.py trace.c7kr --session -1 --replay
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import c7k_trace  # noqa: E402
+import c7ksim  # noqa: E402
+from hid_usage import MODIFIERS, NAME, key_text  # noqa: E402
+
+KIND = {c7k_trace.PRESS: "press", c7k_trace.RELEASE_ALL: "release_all", c7k_trace.TAP: "send",
+        c7k_trace.MOVE: "move", c7k_trace.CLICK: "click"}
+LINK = ("BLE", "USB")
+SHIFT_KEYS = (0xE1, 0xE5)
+
+
+def read_sessions(blob):
+    """Split a trace file into sessions of (t_us, type, a, b) with unwrapped
+    times; for SETTINGS records b is the config dict."""
+    magic, version, size, _ = struct.unpack_from(c7k_trace.HEADER, blob)
+    if magic != c7k_trace.MAGIC or not 1 <= version <= c7k_trace.VERSION or size != c7k_trace.RECORD_SIZE:
+        raise ValueError("not a C7KR trace (v1..v%d)" % c7k_trace.VERSION)
+    sessions = []
+    base = prev = 0
+    o = c7k_trace.HEADER_SIZE
+    while o + size <= len(blob):
+        t, kind, a, b = struct.unpack_from(c7k_trace.RECORD, blob, o)
+        o += size
+        if kind == c7k_trace.SETTINGS:
+            if o + b > len(blob):
+                break
+            b, o = json.loads(blob[o:o + b].decode()), o + b + (-b % size)
+        if kind == c7k_trace.MARK or not sessions:
+            sessions.append([])
+            base, prev = 0, t
+        if t < prev:
+            base += 1 << 32
+        prev = t
+        sessions[-1].append((base + t, kind, a, b))
+    return sessions
+
+
+def combo(mask):
+    return ",".join(str(i) for i in range(14) if mask >> i & 1) or "-"
+
+
+def key_name(code):
+    name = NAME.get(code & 0xFF, "0x%02x" % (code & 0xFF))
+    if code >> 8:
+        name = NAME.get(code >> 8, "0x%02x" % (code >> 8)) + "+" + name
+    return name
+
+
+def describe(kind, a, b):
+    if kind == c7k_trace.MARK:
+        return "MARK   session start"
+    if kind == c7k_trace.MASK:
+        return "MASK   %s" % combo(a | b << 7)
+    if kind == c7k_trace.CHORD:
+        return "CHORD  %s%s -> %s" % (combo(a & 0x7F), "+split" if a & 0x80 else "",
+                                      key_name(b) if b else "(completion)")
+    if kind == c7k_trace.SETTINGS:
+        return "SETTINGS %d chords, %s" % (len(b.get("chords", ())), " ".join(
+            "%s=%g" % kv for kv in sorted(b.get("timing", {}).items())))
+    what = KIND.get(a >> 4, "?")
+    if a >> 4 == c7k_trace.MOVE:
+        arg = "%d,%d" % (struct.unpack("bb", bytes((b & 0xFF, b >> 8))))
+    elif a >> 4 == c7k_trace.CLICK:
+        arg = "buttons=%d" % b
+    else:
+        arg = key_name(b) if b else ""
+    return "SEND   %s %s %s" % (LINK[a & 1], what, arg)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+
+def analyse(records):
+    """Latency from each key-mask change to the chord it resolved, and from a
+    chord to the first HID report after it."""
+    scan_to_chord, chord_to_send = [], []
+    last_mask_t = chord_t = None
+    for t, kind, a, b in records:
+        if kind == c7k_trace.MASK:
+            last_mask_t = t
+        elif kind == c7k_trace.CHORD:
+            if last_mask_t is not None:
+                scan_to_chord.append(t - last_mask_t)
+            chord_t = t
+        elif kind == c7k_trace.SEND and chord_t is not None:
+            chord_to_send.append(t - chord_t)
+            chord_t = None
+    out = {"records": len(records),
+           "masks": sum(1 for r in records if r[1] == c7k_trace.MASK),
+           "chords": sum(1 for r in records if r[1] == c7k_trace.CHORD),
+           "sends": sum(1 for r in records if r[1] == c7k_trace.SEND)}
+    for name, values in (("mask_to_chord_us", scan_to_chord), ("chord_to_send_us", chord_to_send)):
+        out[name] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                     "max": max(values) if values else None}
+    return out
+
+
+def sent_text(records):
+    """The text the recorded HID calls typed, rendered like Simulator.typed()."""
+    out = []
+    for _, kind, a, b in records:
+        if kind == c7k_trace.SEND and a >> 4 in (c7k_trace.PRESS, c7k_trace.TAP):
+            code = b & 0xFF
+            if code and code not in MODIFIERS:
+                out.append(key_text(code, b >> 8 in SHIFT_KEYS))
+    return "".join(out)
+
+
+def replay(records, script=c7ksim.FULL, lead=0.5):
+    """Run the recorded key masks through the firmware with the recorded
+    settings; returns (expected, typed)."""
+    masks = [(t, a, b) for t, kind, a, b in records if kind == c7k_trace.MASK]
+    if not masks:
+        return sent_text(records), ""
+    split = any(b for _, _, b in masks)
+    if split:
+        lead = max(lead, c7ksim.SPLIT_START)
+    t0 = masks[0][0]
+    events = [(lead + (t - t0) / 1e6, "keys", a) for t, a, _ in masks]
+    if split:
+        # Recorded masks already include the link delay: send the half's keys
+        # over an instant link just ahead of the scan that recorded them
+        events += [(lead + (t - t0) / 1e6 - 0.02, "remote", b) for t, _, b in masks]
+        events.append(c7ksim.split_half(delay=0.0, every=0.005))
+    # Settings recorded before the first key all land before it, in order
+    events += [(max(lead / 10, lead + (t - t0) / 1e6), "serial",
+                b"config " + json.dumps(cfg, separators=(",", ":")).encode() + b"\n")
+               for t, kind, _, cfg in records if kind == c7k_trace.SETTINGS]
+    sim = c7ksim.Simulator(script, events, settings={"SPLIT": True} if split else None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.run()
+    return sent_text(records), sim.typed()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("trace")
+    ap.add_argument("--session", type=int, help="session index (negative counts from the end)")
+    ap.add_argument("--timeline", action="store_true", help="print every record")
+    ap.add_argument("--replay", action="store_true", help="replay key masks through the simulator")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    with open(args.trace, "rb") as f:
+        sessions = read_sessions(f.read())
+    picked = list(enumerate(sessions))
+    if args.session is not None:
+        picked = [picked[args.session]]
+
+    results = []
+    for index, records in picked:
+        r = {"session": index, **analyse(records)}
+        if args.replay:
+            expected, typed = replay(records)
+            r["replay"] = {"sent": expected, "replayed": typed, "match": expected == typed}
+        if args.timeline or (args.session is not None and not args.json):
+            t0 = records[0][0]
+            r["timeline"] = ["%10.3f ms  %s" % ((t - t0) / 1000, describe(k, a, b)) for t, k, a, b in records]
+        results.append(r)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for r in results:
+        print("session %d: %d records, %d masks, %d chords, %d sends" % (
+            r["session"], r["records"], r["masks"], r["chords"], r["sends"]))
+        for name in ("mask_to_chord_us", "chord_to_send_us"):
+            v = r[name]
+            if v["p50"] is not None:
+                print("  %-17s p50 %7d  p95 %7d  max %7d" % (name, v["p50"], v["p95"], v["max"]))
+        for line in r.get("timeline", ()):
+            print("  " + line)
+        if "replay" in r:
+            rp = r["replay"]
+            print("  replay %s\n    sent     %r\n    replayed %r" % (
+                "matches" if rp["match"] else "DIFFERS", rp["sent"], rp["replayed"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,635 @@
+"""Host stand-ins for the CircuitPython modules the firmware imports.
+
+Every stand-in reads and writes a shared SimState, so a simulator can press
+keys, plug or unplug USB, drop the BLE link and collect the HID reports each
+transport would have sent. Only the API surface the firmware uses is modelled.
+
+Files at the root of the CIRCUITPY drive ("/words.c7kt", "/trace_on", ...)
+live in SimState.files while the stand-ins are installed: open(), os.stat()
+and os.remove() on such paths never reach the host filesystem.
+"""
+import builtins
+import io
+import os
+import sys
+import types
+
+import hid_usage
+
+
+class SimDone(Exception):
+    """Raised from the virtual time.sleep() once the scripted session ends."""
+
+
+class HIDDevice:
+    """Records reports; each send costs the transport's typical report latency."""
+
+    LATENCY = {"BLE": 0.0075, "USB": 0.001}
+
+    def __init__(self, state, transport):
+        self.state = state
+        self.transport = transport
+        self.latency = self.LATENCY[transport]
+
+    def send_report(self, report):
+        self.state.now += self.latency
+        self.state.reports.append((self.state.now, self.transport, bytes(report)))
+
+
+class SimState:
+    def __init__(self, events=(), usb=False, ble=True, until=None):
+        self.now = 0.0
+        self.sleeps = 0
+        self.mask = 0
+        self.usb_connected = usb
+        self.ble_connected = ble
+        self.ble_advertising = False
+        self.events = sorted(events, key=lambda e: e[0])
+        self.until = until if until is not None else (self.events[-1][0] + 1.0 if self.events else 1.0)
+        self.reports = []
+        self.serial_in = bytearray()
+        self.serial_out = bytearray()
+        self.files = {}             # CIRCUITPY root files: "/name" -> bytes
+        self.file_times = {}        # "/name" -> virtual time of the last write
+        self.nvm = bytearray(b"\xff" * 8192)
+        self.i2c_bytes = 0
+        self.i2c_faults = set()     # addresses that currently NAK
+        self.split_peers = []       # SplitPeer devices a central scan can find
+        self.remote_mask = 0        # keys held on the secondary split half
+        self.ble_devices = [HIDDevice(self, "BLE")]
+        self.usb_devices = [HIDDevice(self, "USB")]
+
+    def check_bus(self, address):
+        if address in self.i2c_faults:
+            raise OSError(19, "no device at 0x%02x" % address)
+
+    def advance(self, dt):
+        self.sleeps += 1
+        self.now += max(dt, 0.0)
+        while self.events and self.events[0][0] <= self.now:
+            _, action, value = self.events.pop(0)
+            if action == "keys":
+                self.mask = value
+            elif action == "usb":
+                self.usb_connected = value
+            elif action == "ble":
+                self.ble_connected = value
+            elif action == "serial":
+                self.serial_in += value
+            elif action == "remote":
+                self.remote_mask = value
+            elif callable(action):
+                action(self, value)
+        if self.now >= self.until:
+            raise SimDone()
+
+
+def on_drive(path):
+    """True for a file at the root of the board's drive, e.g. "/steno.c7kd"."""
+    return isinstance(path, str) and path.startswith("/") and path.rfind("/") == 0
+
+
+class DriveFile(io.BytesIO):
+    """An open file on the simulated drive; writes reach SimState.files on flush."""
+
+    def __init__(self, state, path, mode):
+        if "r" in mode and "+" not in mode and path not in state.files:
+            raise FileNotFoundError(2, "No such file/directory", path)
+        super().__init__(b"" if "w" in mode else state.files.get(path, b""))
+        self.state = state
+        self.path = path
+        self.writing = "r" not in mode or "+" in mode
+        if "a" in mode:
+            self.seek(0, 2)
+        self.flush()
+
+    def flush(self):
+        super().flush()
+        if self.writing and not self.closed:
+            self.state.files[self.path] = self.getvalue()
+            self.state.file_times[self.path] = self.state.now
+
+    def close(self):
+        if not self.closed:
+            self.flush()
+        super().close()
+
+
+def _module(name, **attrs):
+    mod = types.ModuleType(name)
+    mod.__dict__.update(attrs)
+    return mod
+
+
+def _keycode():
+    return type("Keycode", (), dict(hid_usage.KEYCODES))
+
+
+class Keyboard:
+    def __init__(self, devices):
+        self.device = devices[0]
+        self.keys = []
+        self.mods = 0
+
+    def _report(self):
+        keys = (self.keys + [0] * 6)[:6]
+        self.device.send_report(bytes([self.mods, 0] + keys))
+
+    def press(self, *keycodes):
+        for k in keycodes:
+            if 0xE0 <= k <= 0xE7:
+                self.mods |= 1 << (k - 0xE0)
+            elif k not in self.keys:
+                self.keys.append(k)
+        self._report()
+
+    def release(self, *keycodes):
+        for k in keycodes:
+            if 0xE0 <= k <= 0xE7:
+                self.mods &= ~(1 << (k - 0xE0))
+            elif k in self.keys:
+                self.keys.remove(k)
+        self._report()
+
+    def release_all(self):
+        self.keys = []
+        self.mods = 0
+        self._report()
+
+    def send(self, *keycodes):
+        self.press(*keycodes)
+        self.release_all()
+
+
+class Mouse:
+    LEFT_BUTTON = 1
+    RIGHT_BUTTON = 2
+    MIDDLE_BUTTON = 4
+    BACK_BUTTON = 8
+    FORWARD_BUTTON = 16
+
+    def __init__(self, devices):
+        self.device = devices[0]
+
+    def move(self, x=0, y=0, wheel=0):
+        self.device.send_report(bytes([0, x & 0xFF, y & 0xFF, wheel & 0xFF]))
+
+    def click(self, buttons):
+        self.device.send_report(bytes([buttons, 0, 0, 0]))
+        self.device.send_report(bytes([0, 0, 0, 0]))
+
+
+class _Group(list):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.__dict__.update(kwargs)
+
+
+class _Label:
+    def __init__(self, font, text="", **kwargs):
+        self.font = font
+        self.text = text
+        self.__dict__.update(kwargs)
+
+
+class _Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.data = bytearray(width * height)
+
+    def __getitem__(self, xy):
+        return self.data[xy[1] * self.width + xy[0]]
+
+    def __setitem__(self, xy, value):
+        self.data[xy[1] * self.width + xy[0]] = value
+
+
+class _Palette(list):
+    def __init__(self, n):
+        super().__init__([0] * n)
+
+    def make_transparent(self, index):
+        pass
+
+
+class _TileGrid:
+    def __init__(self, bitmap, pixel_shader=None, width=1, height=1, tile_width=None,
+                 tile_height=None, default_tile=0, x=0, y=0):
+        self.bitmap = bitmap
+        self.width = width
+        self.height = height
+        self.tiles = [default_tile] * (width * height)
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, i):
+        return self.tiles[i]
+
+    def __setitem__(self, i, tile):
+        self.tiles[i] = tile
+
+
+class _Font:
+    """terminalio.FONT stand-in: 6x12 cells for ASCII 32..126 in one bitmap row."""
+
+    W, H = 6, 12
+
+    def __init__(self):
+        self.bitmap = _Bitmap(self.W * 95, self.H, 2)
+        for i in range(1, 95):
+            for y in range(2, self.H - 2):
+                for x in range(1, self.W - 1):
+                    self.bitmap[i * self.W + x, y] = (i >> ((x + y) % 7)) & 1
+
+    def get_bounding_box(self):
+        return (self.W, self.H)
+
+    def get_glyph(self, codepoint):
+        if not 32 <= codepoint < 127:
+            return None
+        return types.SimpleNamespace(bitmap=self.bitmap, tile_index=codepoint - 32, width=self.W,
+                                     height=self.H, dx=0, dy=0, shift_x=self.W, shift_y=0)
+
+
+class _Display:
+    def __init__(self, bus, width, height, **kwargs):
+        self.bus = bus
+        self.width = width
+        self.height = height
+        self.root_group = None
+        self.brightness = 1.0
+        self.is_awake = True
+
+    def refresh(self, **kwargs):
+        return True
+
+    def sleep(self):
+        self.is_awake = False
+
+    def wake(self):
+        self.is_awake = True
+
+
+class _Pin:
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+        self.direction = None
+        self.pull = None
+
+    @property
+    def value(self):
+        return not (self.state.mask >> self.index) & 1
+
+
+class _MCP23008:
+    def __init__(self, i2c, address=0x20):
+        self.state = i2c.state
+        self.address = address
+        self.state.check_bus(address)
+        self._iodir = 0xFF
+        self._gppu = 0
+
+    def get_pin(self, pin):
+        return _Pin(self.state, pin)
+
+    @property
+    def gpio(self):
+        self.state.check_bus(self.address)
+        return ~self.state.mask & 0xFF
+
+    @property
+    def iodir(self):
+        return self._iodir
+
+    @iodir.setter
+    def iodir(self, value):
+        self.state.check_bus(self.address)
+        self._iodir = value
+
+    @property
+    def gppu(self):
+        return self._gppu
+
+    @gppu.setter
+    def gppu(self, value):
+        self.state.check_bus(self.address)
+        self._gppu = value
+
+
+class _BLERadio:
+    def __init__(self, state):
+        self.state = state
+        self.name = "c7k"
+
+    @property
+    def connected(self):
+        return self.state.ble_connected or any(p.connected for p in self.state.split_peers)
+
+    @property
+    def advertising(self):
+        return self.state.ble_advertising
+
+    def start_advertising(self, advertisement, scan_response=None, interval=0.1, timeout=None):
+        self.state.ble_advertising = True
+
+    def stop_advertising(self):
+        self.state.ble_advertising = False
+
+    @property
+    def connections(self):
+        host = [_Connection(self.state)] if self.state.ble_connected else []
+        return host + [p.connection for p in self.state.split_peers if p.connected]
+
+    # Central role: only split peers are ever found by a scan
+    def start_scan(self, *advertisement_types, timeout=None, **kwargs):
+        found = False
+        for peer in self.state.split_peers:
+            if not peer.connected:
+                found = True
+                yield types.SimpleNamespace(services=peer.services, peer=peer)
+        if not found and timeout:
+            self.state.now += timeout
+
+    def stop_scan(self):
+        pass
+
+    def connect(self, advertisement, timeout=4.0):
+        advertisement.peer.connected = True
+        return advertisement.peer.connection
+
+
+class _Connection:
+    def __init__(self, state):
+        self.state = state
+
+    @property
+    def connected(self):
+        return self.state.ble_connected
+
+    def disconnect(self):
+        self.state.ble_connected = False
+
+
+class SplitPeer:
+    """A peripheral advertising services; connecting returns one stable
+    Connection whose conn[ServiceClass] is service."""
+
+    def __init__(self, services, service):
+        self.services = services
+        self.service = service
+        self.connected = False
+        self.connection = _PeerConnection(self)
+
+
+class _PeerConnection:
+    def __init__(self, peer):
+        self.peer = peer
+
+    @property
+    def connected(self):
+        return self.peer.connected
+
+    def __getitem__(self, service_class):
+        return self.peer.service
+
+    def disconnect(self):
+        self.peer.connected = False
+
+
+class _Service:
+    def __init__(self, *, service=None, **kwargs):
+        pass
+
+
+class _Characteristic:
+    """A stream characteristic with nothing connected: reads are empty."""
+
+    in_waiting = 0
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.written = bytearray()
+
+    def read(self, n=None):
+        return None
+
+    def write(self, data):
+        self.written += data
+
+
+class _Address:
+    PUBLIC = 0
+    RANDOM_STATIC = 1
+
+    def __init__(self, address, address_type):
+        self.address_bytes = bytes(address)
+        self.type = address_type
+
+
+class _Adapter:
+    def __init__(self):
+        self.address = _Address(b"\x11\x22\x33\x44\x55\xe6", _Address.RANDOM_STATIC)
+
+
+def build(state):
+    """Return {module name: stand-in module} bound to state."""
+    def sleep(dt):
+        state.advance(dt)
+
+    def monotonic():
+        return state.now
+
+    def monotonic_ns():
+        return int(state.now * 1e9)
+
+    class I2C:
+        def __init__(self, *args, **kwargs):
+            self.state = state
+
+        def try_lock(self):
+            return True
+
+        def unlock(self):
+            pass
+
+        def writeto(self, address, buf, start=0, end=None):
+            state.check_bus(address)
+            state.i2c_bytes += len(buf[start:end])
+
+        def deinit(self):
+            pass
+
+    class I2CDevice:
+        def __init__(self, i2c, address):
+            self.address = address
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def write(self, buf, start=0, end=None):
+            state.check_bus(self.address)
+            state.i2c_bytes += len(buf[start:end])
+
+    class DigitalInOut:
+        def __init__(self, pin):
+            self.pin = pin
+            self.direction = None
+            self.value = False
+
+        def deinit(self):
+            pass
+
+    class Runtime:
+        @property
+        def usb_connected(self):
+            return state.usb_connected
+
+        @property
+        def serial_bytes_available(self):
+            return len(state.serial_in)
+
+        autoreload = True
+
+    class HIDService:
+        def __init__(self):
+            self.devices = state.ble_devices
+
+    class Serial:
+        connected = True
+
+        @property
+        def in_waiting(self):
+            return len(state.serial_in)
+
+        def read(self, n=1):
+            data = bytes(state.serial_in[:n])
+            del state.serial_in[:n]
+            return data
+
+        def readline(self):
+            i = state.serial_in.find(b"\n")
+            return self.read(len(state.serial_in) if i < 0 else i + 1)
+
+        def write(self, data):
+            state.serial_out += data
+            return len(data)
+
+    class Stdin:
+        def read(self, n=1):
+            data = bytes(state.serial_in[:n])
+            del state.serial_in[:n]
+            return data.decode()
+
+    def display_bus(i2c, device_address=0x3C):
+        if device_address in state.i2c_faults:
+            raise ValueError("Unable to find I2C Display at %x" % device_address)
+        return i2c
+
+    pins = types.SimpleNamespace(P0_20="P0_20", P0_17="P0_17")
+    Keycode = _keycode()
+    mods = {
+        "time": _module("time", sleep=sleep, monotonic=monotonic, monotonic_ns=monotonic_ns),
+        "board": _module("board", SCL="SCL", SDA="SDA", VCC_OFF="VCC_OFF"),
+        "busio": _module("busio", I2C=I2C),
+        "digitalio": _module(
+            "digitalio", DigitalInOut=DigitalInOut,
+            Direction=types.SimpleNamespace(INPUT="in", OUTPUT="out"),
+            Pull=types.SimpleNamespace(UP="up", DOWN="down"),
+        ),
+        "displayio": _module("displayio", Group=_Group, Bitmap=_Bitmap, Palette=_Palette,
+                             TileGrid=_TileGrid, release_displays=lambda: None),
+        "microcontroller": _module("microcontroller", pin=pins, nvm=state.nvm),
+        "i2cdisplaybus": _module("i2cdisplaybus", I2CDisplayBus=display_bus),
+        "adafruit_displayio_ssd1306": _module("adafruit_displayio_ssd1306", SSD1306=_Display),
+        "adafruit_display_text": _module("adafruit_display_text"),
+        "adafruit_display_text.label": _module("adafruit_display_text.label", Label=_Label),
+        "terminalio": _module("terminalio", FONT=_Font()),
+        "_bleio": _module("_bleio", adapter=_Adapter(), Address=_Address),
+        "adafruit_ble": _module("adafruit_ble", BLERadio=lambda: _BLERadio(state)),
+        "adafruit_ble.advertising": _module("adafruit_ble.advertising"),
+        "adafruit_ble.advertising.standard": _module(
+            "adafruit_ble.advertising.standard",
+            ProvideServicesAdvertisement=lambda *services: services,
+        ),
+        "adafruit_ble.services": _module("adafruit_ble.services", Service=_Service),
+        "adafruit_ble.uuid": _module("adafruit_ble.uuid", VendorUUID=str),
+        "adafruit_ble.characteristics": _module("adafruit_ble.characteristics"),
+        "adafruit_ble.characteristics.stream": _module(
+            "adafruit_ble.characteristics.stream", StreamIn=_Characteristic, StreamOut=_Characteristic),
+        "adafruit_ble.services.standard": _module("adafruit_ble.services.standard"),
+        "adafruit_ble.services.standard.hid": _module("adafruit_ble.services.standard.hid", HIDService=HIDService),
+        "adafruit_hid": _module("adafruit_hid"),
+        "adafruit_hid.keyboard": _module("adafruit_hid.keyboard", Keyboard=Keyboard),
+        "adafruit_hid.keycode": _module("adafruit_hid.keycode", Keycode=Keycode),
+        "adafruit_hid.mouse": _module("adafruit_hid.mouse", Mouse=Mouse),
+        "adafruit_bus_device": _module("adafruit_bus_device"),
+        "adafruit_bus_device.i2c_device": _module("adafruit_bus_device.i2c_device", I2CDevice=I2CDevice),
+        "adafruit_mcp230xx": _module("adafruit_mcp230xx"),
+        "adafruit_mcp230xx.mcp23008": _module("adafruit_mcp230xx.mcp23008", MCP23008=_MCP23008),
+        "supervisor": _module("supervisor", runtime=Runtime()),
+        "usb_hid": _module("usb_hid", devices=state.usb_devices),
+        "usb_cdc": _module("usb_cdc", console=Serial(), data=None),
+    }
+    mods["adafruit_display_text"].label = mods["adafruit_display_text.label"]
+    mods["sys.stdin"] = Stdin()
+    return mods
+
+
+class installed:
+    """Context manager that swaps the stand-ins into sys.modules."""
+
+    def __init__(self, state, src_dir):
+        self.state = state
+        self.mods = build(state)
+        self.stdin = self.mods.pop("sys.stdin")
+        self.src_dir = src_dir
+
+    def __enter__(self):
+        self.saved = {name: sys.modules.get(name) for name in self.mods}
+        self.saved_stdin = sys.stdin
+        sys.stdin = self.stdin
+        self.saved_files = builtins.open, os.stat, os.remove
+        builtins.open, os.stat, os.remove = self.open, self.stat, self.remove
+        sys.modules.update(self.mods)
+        sys.path.insert(0, self.src_dir)
+        self.before = set(sys.modules)
+        return self
+
+    def __exit__(self, *exc):
+        sys.stdin = self.saved_stdin
+        builtins.open, os.stat, os.remove = self.saved_files
+        sys.path.remove(self.src_dir)
+        for name in set(sys.modules) - self.before:
+            del sys.modules[name]
+        for name, mod in self.saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+        return False
+
+    def open(self, path, mode="r", *args, **kwargs):
+        if not on_drive(path):
+            return self.saved_files[0](path, mode, *args, **kwargs)
+        f = DriveFile(self.state, path, mode)
+        return f if "b" in mode else io.TextIOWrapper(f, encoding="utf-8")
+
+    def stat(self, path, *args, **kwargs):
+        if not on_drive(path):
+            return self.saved_files[1](path, *args, **kwargs)
+        if path not in self.state.files:
+            raise FileNotFoundError(2, "No such file/directory", path)
+        t = self.state.file_times.get(path, 0.0)
+        return os.stat_result((0o100644, 0, 0, 1, 0, 0, len(self.state.files[path]), t, t, t))
+
+    def remove(self, path, *args, **kwargs):
+        if not on_drive(path):
+            return self.saved_files[2](path, *args, **kwargs)
+        if self.state.files.pop(path, None) is None:
+            raise FileNotFoundError(2, "No such file/directory", path)
+        self.state.file_times.pop(path, None)